@@ -1,8 +1,21 @@
 # app.py - Enhanced Legal Portal with Font Awesome Icons
+import importlib
+
 import streamlit as st
 
-# Import your page modules
-from modules import summarizer, fraud_checker, property_assistance, educational, will_generator, sassa_loan, home
+from utils.models import warm_up_models
+
+# Page modules are imported the first time their page is opened, so the
+# OCR, PDF and ML stacks they pull in don't slow down the first page load.
+PAGES = {
+    "Home": "modules.home",
+    "Document Summarizer": "modules.summarizer",
+    "Fraud Detection": "modules.fraud_checker",
+    "Will Generator": "modules.will_generator",
+    "Property & Legal Help": "modules.property_assistance",
+    "Know Your Rights": "modules.educational",
+    "SASSA Loan Assistant": "modules.sassa_loan",
+}
 
 def apply_beautiful_styling():
     """Apply beautiful styling with transparent header design and enhanced navigation"""
@@ -518,6 +531,9 @@ st.set_page_config(
 # Apply styling
 apply_beautiful_styling()
 
+# Load any models named in PORTAL_WARM_UP_MODELS, once per server process
+warm_up_models()
+
 # ------------------- Navigation -------------------
 with st.sidebar:
     st.markdown("""
@@ -530,34 +546,14 @@ with st.sidebar:
     
     selected = st.selectbox(
         "Choose a tool:",
-        options=[
-            "Home", 
-            "Document Summarizer", 
-            "Fraud Detection", 
-            "Will Generator", 
-            "Property & Legal Help", 
-            "Know Your Rights", 
-            "SASSA Loan Assistant"
-        ],
+        options=list(PAGES),
         label_visibility="collapsed"
     )
 
 # ------------------- Page Routing -------------------
 if selected == "Home":
     show_hero_header()
-    home.run()
-elif selected == "Document Summarizer":
-    summarizer.run()
-elif selected == "Fraud Detection":
-    fraud_checker.run()
-elif selected == "Will Generator":
-    will_generator.run()
-elif selected == "Property & Legal Help":
-    property_assistance.run()
-elif selected == "Know Your Rights":
-    educational.run()
-elif selected == "SASSA Loan Assistant":
-    sassa_loan.run()
+importlib.import_module(PAGES[selected]).run()
 
 # Enhanced Transparent Footer
 st.markdown("""
@@ -0,0 +1,118 @@
+"""Profile what a fresh server process imports before each page can render.
+
+Every target is imported in a new interpreter with -X importtime, so
+nothing is already cached in sys.modules. --baseline also profiles the old
+eager startup (every page module imported up front) on the portal directory
+as it was at an earlier git revision. Run from the portal directory:
+
+    python -m benchmarks.bench_imports --baseline 03eb4cb > benchmarks/import_profile.txt
+    python -m benchmarks.bench_imports --top 15 modules.summarizer
+"""
+import argparse
+import io
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+PORTAL_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# What app.py imported before showing any page, when every page was imported at startup.
+EAGER_STARTUP = [
+    "streamlit", "modules.summarizer", "modules.fraud_checker", "modules.property_assistance",
+    "modules.educational", "modules.will_generator", "modules.sassa_loan", "modules.home",
+]
+# What each page needs now that app.py imports a page when it is first opened.
+SCENARIOS = {
+    "all pages imported together (today's modules)": EAGER_STARTUP,
+    "Home": ["streamlit", "modules.home"],
+    "Know Your Rights": ["streamlit", "modules.educational"],
+    "Document Summarizer": ["streamlit", "modules.summarizer"],
+    "Fraud Detection": ["streamlit", "modules.fraud_checker"],
+    "SASSA Loan Assistant": ["streamlit", "modules.sassa_loan"],
+    "Will Generator": ["streamlit", "modules.will_generator"],
+}
+
+
+# Imported by every interpreter before any of our code runs.
+STARTUP_PACKAGES = {"site", "encodings", "_frozen_importlib_external", "io", "zipimport", "codecs", "abc"}
+
+
+def profile_imports(modules, cwd=PORTAL_DIR):
+    """Per-module (self_us, cumulative_us, name) rows from -X importtime, plus modules that failed"""
+    code = "\n".join(
+        f"try:\n    import {module}\nexcept ImportError as e:\n    print('missing:', e.name)" for module in modules
+    )
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, cwd=cwd
+    )
+    missing = [line.split(": ", 1)[1] for line in completed.stdout.splitlines() if line.startswith("missing:")]
+
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+    return rows, missing
+
+
+def summarise(rows, top):
+    """Total import time and the heaviest packages pulled in, wherever they were first imported"""
+    total_ms = sum(cumulative for _, cumulative, name in rows if not name.startswith("  ")) / 1000
+    packages = {}
+    for _, cumulative, name in rows:
+        package = name.strip().split(".")[0]
+        if package not in STARTUP_PACKAGES:
+            packages[package] = max(packages.get(package, 0), cumulative)
+    heaviest = sorted(((cumulative, name) for name, cumulative in packages.items()), reverse=True)[:top]
+    return total_ms, heaviest
+
+
+def checkout_portal(revision, directory):
+    """Write the portal directory as it was at a git revision into directory, returning its path"""
+    top_level, prefix = subprocess.run(
+        ["git", "rev-parse", "--show-toplevel", "--show-prefix"], cwd=PORTAL_DIR, capture_output=True, text=True, check=True
+    ).stdout.splitlines()
+    archive = subprocess.run(
+        ["git", "archive", "--format=tar", f"{revision}:{prefix}"], cwd=top_level, capture_output=True, check=True
+    ).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(directory, filter="data")
+    return directory
+
+
+def report(label, modules, top, repeat, cwd=PORTAL_DIR):
+    """Print the median run of several, since a single import profile is noisy"""
+    runs = []
+    for _ in range(repeat):
+        rows, missing = profile_imports(modules, cwd)
+        runs.append((*summarise(rows, top), missing))
+    runs.sort(key=lambda run: run[0])
+    total_ms, heaviest, missing = runs[len(runs) // 2]
+    spread = f", {runs[0][0]:.0f}-{runs[-1][0]:.0f} ms over {repeat} runs" if repeat > 1 else ""
+    print(f"{label}: {total_ms:.0f} ms{spread}" + (f" (not installed: {', '.join(missing)})" if missing else ""))
+    for cumulative, name in heaviest:
+        print(f"    {cumulative / 1000:>8.1f} ms  {name}")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("modules", nargs="*", help="profile these modules instead of the page scenarios")
+    parser.add_argument("--top", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=5, help="runs per scenario; the median is reported")
+    parser.add_argument("--baseline", metavar="REVISION", help="also profile the eager startup at this git revision")
+    args = parser.parse_args()
+
+    if args.baseline:
+        with tempfile.TemporaryDirectory() as directory:
+            report(f"all pages, eager startup at {args.baseline}", EAGER_STARTUP, args.top, args.repeat,
+                   checkout_portal(args.baseline, directory))
+    scenarios = {" + ".join(args.modules): args.modules} if args.modules else SCENARIOS
+    for label, modules in scenarios.items():
+        report(label, modules, args.top, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Compare OCR preprocessing backends by latency per megapixel.
+
+The last column is the mean absolute pixel difference (0-255) between the
+OpenCV pipeline without thresholding and the PIL chain it reproduces.
+
+Run from the portal directory:
+
+    python -m benchmarks.bench_preprocessing
+"""
+import argparse
+import glob
+import os
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from utils.image_preprocessing import PREPROCESSING_BACKENDS, preprocess_image_opencv, preprocess_image_pil
+
+SYNTHETIC_SIZES = [(1240, 1754), (2480, 3508), (4000, 3000)]
+
+
+def synthetic_page(width, height):
+    """A white page covered in lines of text, like a phone photo of a contract"""
+    image = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(image)
+    line = "The tenant shall pay the deposit of R5,000.00 within seven (7) days. " * 4
+    for y in range(40, height - 40, 32):
+        draw.text((40, y), line, fill="black")
+    return image
+
+
+def load_images(test_dir):
+    images = [(f"synthetic {w}x{h}", synthetic_page(w, h)) for w, h in SYNTHETIC_SIZES]
+    for path in sorted(glob.glob(os.path.join(test_dir, "*.png"))):
+        with Image.open(path) as image:
+            images.append((os.path.basename(path), image.convert("RGB")))
+    return images
+
+
+def time_backend(backend, image, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        backend(image)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def difference_from_pil(image):
+    """Mean absolute pixel difference between the OpenCV steps (no threshold) and the PIL chain"""
+    reference = np.asarray(preprocess_image_pil(image), dtype=np.int16)
+    candidate = np.asarray(preprocess_image_opencv(image, threshold=False), dtype=np.int16)
+    return float(np.abs(reference - candidate).mean())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--test-dir", default="test_documents")
+    args = parser.parse_args()
+
+    names = list(PREPROCESSING_BACKENDS)
+    print(f"{'image':<32}{'MP':>7}" + "".join(f"{name + ' ms/MP':>16}" for name in names) + f"{'diff vs pil':>14}")
+
+    for label, image in load_images(args.test_dir):
+        megapixels = image.width * image.height / 1e6
+        row = f"{label:<32}{megapixels:>7.2f}"
+        for name in names:
+            seconds = time_backend(PREPROCESSING_BACKENDS[name], image, args.repeats)
+            row += f"{seconds * 1000 / megapixels:>16.1f}"
+        print(row + f"{difference_from_pil(image):>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Compare summarization inference backends on the bundled contracts.
+
+Each backend runs in its own process so peak RSS is measured in isolation.
+ROUGE scores compare every backend's summaries to the float32 torch ones.
+Run from the portal directory:
+
+    python -m benchmarks.bench_summarization --backends torch int8 onnx
+"""
+import argparse
+import glob
+import os
+import resource
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+REFERENCE_BACKEND = "torch"
+
+
+def load_documents(test_dir):
+    documents = []
+    for path in sorted(glob.glob(os.path.join(test_dir, "*.txt"))):
+        with open(path, encoding="utf-8") as f:
+            documents.append((os.path.basename(path), f.read()))
+    return documents
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if os.uname().sysname == "Darwin" else peak / 1024
+
+
+def run_backend(backend, documents):
+    """Load one backend and summarise every document; runs in a fresh process"""
+    from utils.models import load_summarization_pipeline
+    from utils.summarization import map_reduce_summarize
+
+    start = time.perf_counter()
+    pipe = load_summarization_pipeline(backend)
+    load_seconds = time.perf_counter() - start
+
+    # One warm-up call so the first document doesn't pay for lazy initialisation.
+    map_reduce_summarize(documents[0][1], pipe)
+
+    results = []
+    for name, text in documents:
+        start = time.perf_counter()
+        summary = map_reduce_summarize(text, pipe)
+        results.append((name, time.perf_counter() - start, summary))
+    return load_seconds, peak_rss_mb(), results
+
+
+# ---------------- ROUGE ----------------
+def _tokens(text):
+    return [word.strip(".,;:!?()\"'").lower() for word in text.split() if word.strip(".,;:!?()\"'")]
+
+
+def _f1(overlap, candidate_len, reference_len):
+    if not overlap:
+        return 0.0
+    precision, recall = overlap / candidate_len, overlap / reference_len
+    return 2 * precision * recall / (precision + recall)
+
+
+def rouge_1(candidate, reference):
+    candidate, reference = _tokens(candidate), _tokens(reference)
+    overlap = sum((Counter(candidate) & Counter(reference)).values())
+    return _f1(overlap, len(candidate), len(reference))
+
+
+def rouge_l(candidate, reference):
+    candidate, reference = _tokens(candidate), _tokens(reference)
+    previous = [0] * (len(reference) + 1)
+    for word in candidate:
+        current = [0]
+        for j, ref_word in enumerate(reference):
+            current.append(previous[j] + 1 if word == ref_word else max(previous[j + 1], current[j]))
+        previous = current
+    return _f1(previous[-1], len(candidate), len(reference))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--backends", nargs="+", default=["torch", "int8"])
+    parser.add_argument("--test-dir", default="test_documents")
+    args = parser.parse_args()
+
+    documents = load_documents(args.test_dir)
+    backends = [REFERENCE_BACKEND] + [b for b in args.backends if b != REFERENCE_BACKEND]
+
+    runs = {}
+    for backend in backends:
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            try:
+                runs[backend] = pool.submit(run_backend, backend, documents).result()
+            except Exception as e:
+                print(f"{backend}: skipped ({e})")
+
+    if REFERENCE_BACKEND not in runs:
+        return
+    references = {name: summary for name, _, summary in runs[REFERENCE_BACKEND][2]}
+
+    print(f"{'backend':<10}{'load s':>9}{'peak RSS MB':>13}{'mean s/doc':>12}{'ROUGE-1':>10}{'ROUGE-L':>10}")
+    for backend, (load_seconds, rss_mb, results) in runs.items():
+        mean_seconds = sum(seconds for _, seconds, _ in results) / len(results)
+        r1 = sum(rouge_1(summary, references[name]) for name, _, summary in results) / len(results)
+        rl = sum(rouge_l(summary, references[name]) for name, _, summary in results) / len(results)
+        print(f"{backend:<10}{load_seconds:>9.1f}{rss_mb:>13.0f}{mean_seconds:>12.2f}{r1:>10.3f}{rl:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
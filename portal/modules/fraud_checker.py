@@ -1,18 +1,21 @@
 import streamlit as st
-import numpy as np
-import pandas as pd
-from PIL import Image, ImageEnhance, ImageFilter
-import re
-import datetime
-from collections import Counter
-import fitz  # PyMuPDF
+import html
+import os
 import tempfile
-from gtts import gTTS
-import time
+import zipfile
+from collections import Counter
+from utils.bulk_screening import MAX_BULK_DOCUMENTS, report_bytes, report_frame, screen_documents, unpack_zip
+from utils.document_index import DocumentIndex, as_index
+from utils.extraction import load_document
+from utils.fraud_lexicon import ReloadingLexicon
+from utils.fraud_scoring import FraudScoringModel
+from utils.ocr_backends import select_ocr_engine
 
 # ---------------- Config ----------------
 SUPPORTED_FORMATS = ["jpg", "jpeg", "png", "webp", "pdf", "txt"]
 MAX_FILE_SIZE = 10 * 1024 * 1024
+SINGLE_MODE = "Single document"
+BULK_MODE = "Bulk screening (ZIP)"
 
 # ---------------- Professional Legal Portal Styling ----------------
 def apply_legal_portal_styling():
@@ -302,78 +305,240 @@ def apply_legal_portal_styling():
     """, unsafe_allow_html=True)
 
 # ---------------- Fraud Detection Logic ----------------
+# Characters of context shown either side of a finding; closer findings share one excerpt.
+EVIDENCE_CONTEXT_CHARS = 120
+EVIDENCE_MAX_EXCERPT_CHARS = 600
+MAX_EVIDENCE_EXCERPTS = 100
+
+def evidence_windows(index, matches, context=EVIDENCE_CONTEXT_CHARS):
+    """Group matches (in text order) into non-overlapping excerpts, one page at a time
+
+    A match that runs over a page break belongs to the page it starts on and
+    its excerpt runs on to the end of the match.
+    """
+    windows = []
+    for match in matches:
+        window = windows[-1] if windows else None
+        page_start, page_end = index.page_bounds(match.start)
+        page_end = max(page_end, match.end)
+        same_page = window is not None and window['page'] == match.page
+        findings_end = max(found.end for found in window['matches']) if window else 0
+        # A match overlapping one already shown (another category's hit on the same words) always joins it.
+        overlaps = window is not None and match.start < findings_end
+        if overlaps or (same_page and match.start - context <= window['end']
+                        and match.end - window['start'] <= EVIDENCE_MAX_EXCERPT_CHARS):
+            extended = min(max(window['end'], match.end + context), page_end)
+            window['end'] = max(min(extended, window['start'] + EVIDENCE_MAX_EXCERPT_CHARS), findings_end, match.end)
+            window['matches'].append(match)
+            continue
+
+        start = max(match.start - context, page_start)
+        if window is not None:
+            # Start after the previous excerpt's findings and cut that excerpt off here,
+            # so no text (and no finding) is shown twice.
+            start = max(start, findings_end)
+            window['end'] = min(window['end'], start)
+        windows.append({
+            'start': start,
+            'end': min(match.end + context, page_end, max(start + EVIDENCE_MAX_EXCERPT_CHARS, match.end)),
+            'page': match.page,
+            'matches': [match],
+        })
+    return windows
+
+# The categories the score and the report are built from; the lexicon files may add more.
+RISK_CATEGORIES = ('suspicious_phrases', 'red_flags', 'urgency_indicators', 'financial_promises')
+
 class FraudDetector:
-    def __init__(self):
-        self.suspicious_phrases = [
-            "guaranteed return", "risk-free investment", "act now", "limited time offer",
-            "no risk", "easy money", "get rich quick", "urgent action required",
-            "confidential", "wire transfer", "advance fee", "inheritance",
-            "lottery winner", "tax refund", "suspended account", "verify immediately",
-            "click here now", "congratulations you have won", "final notice",
-            "processing fee", "handling charges", "clearance certificate"
-        ]
-        
-        self.legal_red_flags = [
-            "forged", "altered", "backdated", "unsigned", "incomplete",
-            "copy", "duplicate", "amended without authorization", "falsified",
-            "counterfeit", "fabricated", "modified", "tampered"
-        ]
-
-    def analyze_text_patterns(self, text):
-        results = {
-            'suspicious_phrases': [],
-            'red_flags': [],
-            'urgency_indicators': [],
-            'financial_promises': []
-        }
-        
-        text_lower = text.lower()
-        
-        for phrase in self.suspicious_phrases:
-            if phrase in text_lower:
-                results['suspicious_phrases'].append(phrase)
-        
-        for flag in self.legal_red_flags:
-            if flag in text_lower:
-                results['red_flags'].append(flag)
-        
-        urgency_patterns = [r'\b(urgent|immediately|asap|deadline|expires?)\b']
-        for pattern in urgency_patterns:
-            matches = re.findall(pattern, text_lower)
-            results['urgency_indicators'].extend(matches)
+    """Scores documents against the fraud lexicon, reloaded when its files change"""
+
+    def __init__(self, lexicon=None, scoring_model=None):
+        self.lexicon_source = lexicon or ReloadingLexicon()
+        self._scoring_model = scoring_model
+
+    @property
+    def scoring_model(self):
+        # Read from disk on first use, then kept for the life of the detector.
+        if self._scoring_model is None:
+            self._scoring_model = FraudScoringModel.load()
+        return self._scoring_model
+
+    @property
+    def lexicon(self):
+        return self.lexicon_source.current()
+
+    def find_matches(self, document, lexicon=None):
+        """Every lexicon hit in a document, with character offsets and page numbers"""
+        lexicon = lexicon or self.lexicon
+        index = as_index(document)
+        matches = []
+        for match in lexicon.matcher.finditer(index.text):
+            match.page = index.page_at(match.start)
+            matches.append(match)
+        return matches
+
+    def analyze_text_patterns(self, document):
+        # One snapshot for the whole document, even if a reload lands midway.
+        lexicon = self.lexicon
+        index = as_index(document)
+        results = {category: [] for category in RISK_CATEGORIES}
+        results['matches'] = self.find_matches(index, lexicon)
+        results['evidence'] = evidence_windows(index, results['matches'])
         
-        financial_patterns = [r'\$[\d,]+\+?', r'\b\d+%\s*(return|profit|interest)\b']
-        for pattern in financial_patterns:
-            matches = re.findall(pattern, text_lower)
-            results['financial_promises'].extend(matches)
+        for match in results['matches']:
+            found = results.setdefault(match.category, [])
+            # Phrases are listed once each; pattern hits count every occurrence.
+            if not lexicon.is_phrase_category(match.category) or match.key not in found:
+                found.append(match.key)
         
+        results['occurrences'] = dict(Counter(match.category for match in results['matches']))
+        results['word_count'] = len(index.tokens)
+        results['lexicon_version'] = lexicon.version
         return results
 
     def calculate_risk_score(self, analysis_results):
-        score = 0
-        score += len(analysis_results['suspicious_phrases']) * 15
-        score += len(analysis_results['red_flags']) * 25
-        score += len(analysis_results['urgency_indicators']) * 10
-        score += len(analysis_results['financial_promises']) * 20
-        return min(score, 100)
-
-# ---------------- Text Extraction Functions ----------------
-def extract_text_from_pdf(uploaded_file):
-    try:
-        uploaded_file.seek(0)
-        pdf_bytes = uploaded_file.read()
-        pdf_document = fitz.open(stream=pdf_bytes, filetype="pdf")
-        
-        text = ""
-        for page_num in range(pdf_document.page_count):
-            page = pdf_document[page_num]
-            text += page.get_text()
-        
-        pdf_document.close()
-        return text.strip()
-    except Exception as e:
-        st.error(f"PDF extraction failed: {str(e)}")
-        return ""
+        """0-100 probability of fraud from the trained scoring model"""
+        return self.scoring_model.score(analysis_results)
+
+    def calculate_risk_scores(self, analysis_results):
+        """Scores for many documents' results in one vectorised pass"""
+        return self.scoring_model.score_batch(analysis_results)
+
+def risk_level(risk_score):
+    if risk_score >= 70:
+        return "HIGH"
+    if risk_score >= 40:
+        return "MEDIUM"
+    return "LOW"
+
+# ---------------- Evidence View ----------------
+CATEGORY_LABELS = {
+    'suspicious_phrases': "Suspicious phrase",
+    'red_flags': "Legal red flag",
+    'urgency_indicators': "Urgency",
+    'financial_promises': "Financial promise",
+}
+CATEGORY_COLOURS = {
+    'suspicious_phrases': "#BFDBFE",
+    'red_flags': "#FECACA",
+    'urgency_indicators': "#DDD6FE",
+    'financial_promises': "#F5D0FE",
+}
+
+def highlight_excerpt(index, window):
+    """The excerpt's text as HTML, each match marked, trimmed to whole words at the edges"""
+    start, end = window['start'], window['end']
+    # Drop part-words at either edge; trimming inwards keeps excerpts within their bounds.
+    first, last = window['matches'][0].start, max(match.end for match in window['matches'])
+    while 0 < start < first and start - window['start'] < 20 and not index.text[start - 1].isspace():
+        start += 1
+    while last < end < len(index.text) and window['end'] - end < 20 and not index.text[end].isspace():
+        end -= 1
+
+    # An ellipsis only where the excerpt cuts into a line, not at a page or line break.
+    parts = ["&hellip;" if start > 0 and index.text[start - 1] != "\n" else ""]
+    position = start
+    for match in window['matches']:
+        if match.start < position:
+            continue
+        colour = CATEGORY_COLOURS.get(match.category, "#FDE68A")
+        label = CATEGORY_LABELS.get(match.category, match.category.replace('_', ' ').capitalize())
+        parts.append(html.escape(index.text[position:match.start]))
+        parts.append(
+            f'<mark title="{html.escape(label)}" style="background: {colour}; padding: 0 0.15rem; border-radius: 3px;">'
+            f'{html.escape(index.text[match.start:match.end])}</mark>'
+        )
+        position = match.end
+    parts.append(html.escape(index.text[position:end]))
+    parts.append("&hellip;" if end < len(index.text) and index.text[end] != "\n" else "")
+    return "".join(parts).replace("\n", "<br>")
+
+def render_evidence(index, evidence):
+    """Every finding highlighted in its surrounding text, with the page it is on"""
+    finding_count = sum(len(window['matches']) for window in evidence)
+    with st.expander(f"Evidence in context ({finding_count} findings in {len(evidence)} excerpts)", expanded=False):
+        categories = sorted({match.category for window in evidence for match in window['matches']})
+        selected = st.multiselect(
+            "Show findings of type",
+            categories,
+            default=categories,
+            format_func=lambda category: CATEGORY_LABELS.get(category, category),
+            key="fraud_evidence_categories",
+        )
+        shown = [window for window in evidence if any(match.category in selected for match in window['matches'])]
+        for window in shown[:MAX_EVIDENCE_EXCERPTS]:
+            page = f"Page {window['page']}" if window['page'] is not None else f"Character {window['start']}"
+            st.markdown(f"""
+            <div style="
+                padding: 0.6rem 1rem;
+                margin: 0.5rem 0;
+                border-radius: 6px;
+                border: 1px solid rgba(99, 102, 241, 0.3);
+                font-size: 0.9rem;
+                color: #1E293B;
+                background: white;
+            "><strong style="color: #4F46E5;">{page}</strong><br>{highlight_excerpt(index, window)}</div>
+            """, unsafe_allow_html=True)
+        if len(shown) > MAX_EVIDENCE_EXCERPTS:
+            st.caption(f"Showing the first {MAX_EVIDENCE_EXCERPTS} of {len(shown)} excerpts.")
+
+# ---------------- Bulk Screening ----------------
+def render_bulk_screening(ocr_engine):
+    """Screen every document in a ZIP, filling a sortable table as each one finishes"""
+    uploaded_zip = st.file_uploader(
+        "Choose a ZIP of documents to screen",
+        type=["zip"],
+        help=f"PDF, image and TXT files inside the ZIP are screened, up to {MAX_BULK_DOCUMENTS} documents of 10MB each",
+        key="fraud_bulk_zip",
+    )
+    if uploaded_zip is None:
+        return
+
+    upload_key = (uploaded_zip.name, uploaded_zip.size)
+    if st.button("Screen documents", type="primary"):
+        table = st.empty()
+        progress = st.progress(0.0)
+        rows = []
+        try:
+            with tempfile.TemporaryDirectory() as directory:
+                documents = unpack_zip(uploaded_zip, directory)
+                if not documents:
+                    st.warning("The ZIP does not contain any PDF, image or TXT documents.")
+                    return
+                for row in screen_documents(documents, ocr_engine=ocr_engine):
+                    rows.append(row)
+                    progress.progress(len(rows) / len(documents), text=f"Screened {len(rows)} of {len(documents)}: {row['document']}")
+                    table.dataframe(report_frame(rows), hide_index=True, use_container_width=True)
+        except (ValueError, zipfile.BadZipFile) as e:
+            st.error(f"Could not read the ZIP: {str(e)}")
+            return
+        progress.empty()
+        table.empty()
+        st.session_state["fraud_bulk_report"] = (upload_key, rows)
+
+    stored = st.session_state.get("fraud_bulk_report")
+    if not stored or stored[0] != upload_key:
+        return
+    rows = stored[1]
+    flagged = sum(1 for row in rows if row["risk_level"] == "HIGH")
+    failed = sum(1 for row in rows if row["error"])
+    st.markdown(f"**{len(rows)} documents screened:** {flagged} high risk" + (f", {failed} could not be read" if failed else ""))
+    st.dataframe(report_frame(rows), hide_index=True, use_container_width=True)
+
+    report_name = os.path.splitext(uploaded_zip.name)[0] + "_screening"
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button("Download CSV report", report_bytes(rows, "csv"), f"{report_name}.csv", "text/csv")
+    with col2:
+        try:
+            parquet = report_bytes(rows, "parquet")
+        except ImportError:
+            st.caption("Parquet export needs pyarrow installed.")
+        else:
+            st.download_button("Download Parquet report", parquet, f"{report_name}.parquet", "application/octet-stream")
+
+# Built once per process; the lexicon inside it reloads itself when its files change.
+fraud_detector = FraudDetector()
 
 # ---------------- Main Application ----------------
 def run():
@@ -394,15 +559,19 @@ def run():
     </div>
     """, unsafe_allow_html=True)
 
-    # Initialize fraud detector
-    detector = FraudDetector()
+    mode = st.radio("Mode", [SINGLE_MODE, BULK_MODE], horizontal=True, key="fraud_mode")
 
     # File upload section
-    uploaded_file = st.file_uploader(
-        "Choose a legal document to analyze", 
-        type=SUPPORTED_FORMATS,
-        help="Supported formats: PDF, JPG, PNG, WEBP, TXT (Max 10MB)"
-    )
+    uploaded_file = None
+    if mode == SINGLE_MODE:
+        uploaded_file = st.file_uploader(
+            "Choose a legal document to analyze", 
+            type=SUPPORTED_FORMATS,
+            help="Supported formats: PDF, JPG, PNG, WEBP, TXT (Max 10MB)"
+        )
+    ocr_engine = select_ocr_engine("OCR engine for images and scanned pages", key="fraud_ocr_engine")
+    if mode == BULK_MODE:
+        render_bulk_screening(ocr_engine)
 
     if uploaded_file is not None:
         if uploaded_file.size > MAX_FILE_SIZE:
@@ -413,42 +582,31 @@ def run():
 
         # Extract text
         with st.spinner("Analyzing document..."):
-            extracted_text = ""
-            
-            if uploaded_file.type == "application/pdf":
-                extracted_text = extract_text_from_pdf(uploaded_file)
-            elif uploaded_file.type == "text/plain":
-                try:
-                    extracted_text = str(uploaded_file.read(), "utf-8")
-                except:
-                    extracted_text = uploaded_file.read().decode('utf-8', errors='ignore')
-            else:
-                st.warning("Image-based OCR is temporarily unavailable. Please upload PDF or text files.")
-                return
+            try:
+                document = load_document(uploaded_file, ocr_engine=ocr_engine)
+                extracted_text = document.text
+            except Exception as e:
+                st.error(f"Text extraction failed: {str(e)}")
+                extracted_text = ""
 
         if extracted_text and len(extracted_text.strip()) > 0:
             # Run fraud detection
-            patterns = detector.analyze_text_patterns(extracted_text)
-            risk_score = detector.calculate_risk_score(patterns)
+            index = DocumentIndex(extracted_text, page_offsets=document.page_offsets)
+            patterns = fraud_detector.analyze_text_patterns(index)
+            risk_score = fraud_detector.calculate_risk_score(patterns)
             
             # Determine risk level
-            if risk_score >= 70:
-                risk_level = "HIGH"
-                risk_class = "risk-high"
-            elif risk_score >= 40:
-                risk_level = "MEDIUM"
-                risk_class = "risk-medium"
-            else:
-                risk_level = "LOW"
-                risk_class = "risk-low"
+            level = risk_level(risk_score)
+            risk_class = f"risk-{level.lower()}"
             
             # Display results
             st.markdown(f"""
             <div class="{risk_class}">
-                <h2>Risk Level: {risk_level}</h2>
+                <h2>Risk Level: {level}</h2>
                 <h3>Risk Score: {risk_score}/100</h3>
             </div>
             """, unsafe_allow_html=True)
+            st.caption(f"Checked against fraud lexicon {patterns['lexicon_version']}")
             
             # Show metrics
             col1, col2, col3 = st.columns(3)
@@ -633,6 +791,9 @@ def run():
                 - Verify important details
                 """)
             
+            if patterns['evidence']:
+                render_evidence(index, patterns['evidence'])
+
             # Text preview
             with st.expander("View Extracted Text", expanded=False):
                 preview_text = extracted_text[:1000] + "..." if len(extracted_text) > 1000 else extracted_text
@@ -1,5 +1,4 @@
 import streamlit as st
-from gtts import gTTS
 import tempfile
 
 def apply_legal_home_styling():
@@ -279,6 +278,7 @@ def apply_legal_home_styling():
 
 def play_audio(text="Welcome to the Legal Literacy Portal!", auto_play=False):
     try:
+        from gtts import gTTS
         tts = gTTS(text=text, lang="en", slow=False)
         tmp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3")
         tts.save(tmp_file.name)
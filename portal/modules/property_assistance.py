@@ -4,6 +4,7 @@ import streamlit as st
 from datetime import datetime
 import traceback
 import logging
+from utils.ingestion import copy_upload
 
 # ---------------------------
 # Config / logging
@@ -814,8 +815,7 @@ def run():
                             for f in uploaded_files:
                                 safe_name = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{f.name}"
                                 path = os.path.join(UPLOAD_DIR, safe_name)
-                                with open(path, "wb") as out:
-                                    out.write(f.getbuffer())
+                                copy_upload(f, path)
                                 file_names.append(safe_name)
 
                         # Generate query data
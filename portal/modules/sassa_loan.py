@@ -3,7 +3,8 @@ import datetime
 import re
 import tempfile
 import os
-from gtts import gTTS
+from utils.document_index import as_index
+from utils.extraction import load_document
 
 # ---------------- SASSA Loans Analysis Engine ----------------
 class SASSALoanAnalyzer:
@@ -47,7 +48,8 @@ class SASSALoanAnalyzer:
             "alternative_options": []
         }
         
-        text_lower = document_text.lower()
+        index = as_index(document_text)
+        text_lower = index.lower
         
         # Check for red flag phrases
         red_flags_found = []
@@ -62,12 +64,12 @@ class SASSALoanAnalyzer:
         # Check for high-risk lending practices
         high_risk_found = []
         for indicator in self.high_risk_indicators:
-            if any(word in text_lower for word in indicator.split()):
+            if any(index.has_term(word) for word in indicator.split()):
                 high_risk_found.append(indicator)
                 analysis["risk_score"] += 10
         
         # Interest rate analysis
-        interest_matches = re.findall(r'(\d+\.?\d*)\s*%', document_text)
+        interest_matches = re.findall(r'(\d+\.?\d*)\s*%', index.text)
         if interest_matches:
             max_interest = max(float(rate) for rate in interest_matches)
             if max_interest > 27.5:
@@ -162,6 +164,7 @@ class SASSALoanAnalyzer:
 def generate_sassa_audio(text, language='en'):
     """Generate audio explanation"""
     try:
+        from gtts import gTTS
         tts = gTTS(text=text, lang=language, slow=False)
         temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3")
         tts.save(temp_file.name)
@@ -723,9 +726,20 @@ def run():
             help="Upload a digital copy or photograph of your loan documentation"
         )
         
+        uploaded_text = ""
         if uploaded_file is not None:
-            st.success("Document uploaded successfully")
-            st.info("For comprehensive analysis, please also paste the text details above")
+            try:
+                with st.spinner("Reading your document..."):
+                    uploaded_text = load_document(uploaded_file).text
+            except Exception as e:
+                st.error(f"Could not read document: {str(e)}")
+
+            if uploaded_text:
+                st.success("Document uploaded successfully")
+                with st.expander("View extracted document text"):
+                    st.text(uploaded_text[:1000] + ("..." if len(uploaded_text) > 1000 else ""))
+            else:
+                st.info("We could not read text from this document, please paste the loan details above")
     
     with col2:
         st.subheader("Financial Information")
@@ -756,7 +770,8 @@ def run():
     
     # Analysis button
     if st.button("ANALYZE LOAN OFFER", key="scan_loan", help="Comprehensive analysis of the loan terms and conditions"):
-        if document_text.strip() or uploaded_file:
+        if document_text.strip() or uploaded_text:
+            full_text = "\n".join(part for part in (document_text.strip(), uploaded_text) if part)
             
             # Show scanning progress
             with st.spinner("Analyzing loan document for compliance and risks..."):
@@ -771,7 +786,7 @@ def run():
                 
                 # Perform analysis
                 analysis = analyzer.analyze_loan_document(
-                    document_text, 
+                    full_text, 
                     loan_amount=loan_amount, 
                     monthly_payment=monthly_payment, 
                     grant_amount=grant_amount
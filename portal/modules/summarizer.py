@@ -1,19 +1,26 @@
 import streamlit as st
-import numpy as np
-import os
-from PIL import Image, ImageEnhance, ImageFilter
-import io
 import tempfile
-from gtts import gTTS
-import fitz  # PyMuPDF
-import time
-import pytesseract
 import re
-from datetime import datetime, timedelta
+import logging
+from modules.fraud_checker import fraud_detector
+from utils.batching import summarization_batcher
+from utils.document_index import DocumentIndex, as_index
+from utils.extraction import DocumentStream, get_document_kind
+from utils.jobs import FAILED, QUEUED, JobQueueFull, job_queue
+from utils.models import SUMMARIZATION_BACKEND, SUMMARIZATION_MODEL, model_stats
+from utils.ocr_backends import select_ocr_engine
+from utils.simplification import jargon_simplifier, simplify_legal_text
+from utils.summarization import (
+    CHUNK_TOKENS, EXTRACTIVE_SENTENCES, MAX_SUMMARY_TOKENS, SUMMARY_MAX_LENGTH, SUMMARY_MIN_LENGTH, TEXTRANK_VERSION,
+    map_reduce_summarize, textrank_summarize
+)
+from utils.summary_cache import summary_cache, summary_key
 
 # ---------------- Config ----------------
-SUPPORTED_FORMATS = ["jpg","jpeg","png","webp","pdf","txt","doc","docx"]
+SUPPORTED_FORMATS = ["jpg","jpeg","png","webp","tif","tiff","pdf","txt","doc","docx"]
 MAX_FILE_SIZE = 10*1024*1024
+ANALYSIS_STEPS = 5
+ANALYSIS_POLL_SECONDS = 0.5
 
 # ---------------- Progress Indicator ----------------
 def create_progress_indicator(step, total_steps):
@@ -258,94 +265,51 @@ def apply_legal_portal_styling():
     </style>
     """, unsafe_allow_html=True)
 
-# ---------------- Enhanced OCR ----------------
-def preprocess_image(image):
-    """Enhanced image preprocessing for better OCR results"""
-    if image.mode != 'RGB': 
-        image = image.convert('RGB')
-    
-    width, height = image.size
-    if width > 2000 or height > 2000:
-        ratio = min(2000/width, 2000/height)
-        new_size = (int(width * ratio), int(height * ratio))
-        image = image.resize(new_size, Image.Resampling.LANCZOS)
-    
-    image = ImageEnhance.Contrast(image).enhance(1.5)
-    image = ImageEnhance.Sharpness(image).enhance(1.3)
-    image = image.convert('L')
-    image = image.filter(ImageFilter.MedianFilter(size=3))
-    
-    return image
+# ---------------- Document Type Detection ----------------
+# Checked in order; the first type with a matching keyword wins.
+DOCUMENT_TYPES = [
+    ("rental_agreement", "Rental/Lease Agreement", ['lease', 'tenant', 'landlord', 'rent', 'premises']),
+    ("employment", "Employment Contract", ['employment', 'employee', 'employer', 'salary', 'wages']),
+    ("financial", "Financial/Loan Agreement", ['loan', 'credit', 'debt', 'payment', 'interest']),
+    ("insurance", "Insurance Policy", ['insurance', 'policy', 'coverage', 'claim', 'premium']),
+    ("purchase", "Purchase/Sales Agreement", ['purchase', 'sale', 'buyer', 'seller', 'goods']),
+    ("service", "Service Agreement", ['service', 'provider', 'client', 'services']),
+]
 
-def extract_text_from_image(image):
-    """Extract text from image using Tesseract OCR"""
-    try:
-        processed = preprocess_image(image)
-        text = pytesseract.image_to_string(processed, lang='eng')
-        return text.strip()
-    except Exception as e:
-        st.error(f"OCR extraction failed: {str(e)}")
-        return ""
+def document_type_from_keywords(found_keywords):
+    """Pick the document type from the set of type keywords present in it"""
+    for doc_type, display_name, keywords in DOCUMENT_TYPES:
+        if any(word in found_keywords for word in keywords):
+            return doc_type, display_name
+    return "general", "Legal Document"
 
-def extract_text_from_pdf(uploaded_file):
-    """Extract text from PDF using PyMuPDF"""
-    try:
-        uploaded_file.seek(0)
-        pdf_bytes = uploaded_file.read()
-        pdf_document = fitz.open(stream=pdf_bytes, filetype="pdf")
-        
-        text = ""
-        for page_num in range(pdf_document.page_count):
-            page = pdf_document[page_num]
-            text += page.get_text()
-        
-        pdf_document.close()
-        return text.strip()
-    
-    except Exception as e:
-        st.error(f"PDF extraction failed: {str(e)}")
-        return ""
+def find_type_keywords(index):
+    """All document type keywords that appear in an indexed document"""
+    return {word for _, _, keywords in DOCUMENT_TYPES for word in keywords if index.contains(word)}
 
-# ---------------- Document Type Detection ----------------
-def detect_document_type(text):
+def detect_document_type(document):
     """Detect the type of legal document"""
-    text_lower = text.lower()
-    
-    if any(word in text_lower for word in ['lease', 'tenant', 'landlord', 'rent', 'premises']):
-        return "rental_agreement", "Rental/Lease Agreement"
-    elif any(word in text_lower for word in ['employment', 'employee', 'employer', 'salary', 'wages']):
-        return "employment", "Employment Contract"
-    elif any(word in text_lower for word in ['loan', 'credit', 'debt', 'payment', 'interest']):
-        return "financial", "Financial/Loan Agreement"
-    elif any(word in text_lower for word in ['insurance', 'policy', 'coverage', 'claim', 'premium']):
-        return "insurance", "Insurance Policy"
-    elif any(word in text_lower for word in ['purchase', 'sale', 'buyer', 'seller', 'goods']):
-        return "purchase", "Purchase/Sales Agreement"
-    elif any(word in text_lower for word in ['service', 'provider', 'client', 'services']):
-        return "service", "Service Agreement"
-    else:
-        return "general", "Legal Document"
+    return document_type_from_keywords(find_type_keywords(as_index(document)))
 
 # ---------------- Risk Assessment ----------------
-def assess_document_risks(text, doc_type):
+HIGH_RISK_TERMS = [
+    'penalty', 'forfeit', 'liable', 'damages', 'breach', 'default',
+    'terminate', 'evict', 'garnish', 'sue', 'court', 'legal action'
+]
+
+MEDIUM_RISK_TERMS = [
+    'fee', 'charge', 'deposit', 'non-refundable', 'binding',
+    'irrevocable', 'waive', 'surrender'
+]
+
+def assess_document_risks(document, doc_type):
     """Assess potential risks in the document"""
     risks = []
-    text_lower = text.lower()
+    index = as_index(document)
     
-    # High-risk patterns
-    high_risk_terms = [
-        'penalty', 'forfeit', 'liable', 'damages', 'breach', 'default',
-        'terminate', 'evict', 'garnish', 'sue', 'court', 'legal action'
-    ]
-    
-    medium_risk_terms = [
-        'fee', 'charge', 'deposit', 'non-refundable', 'binding',
-        'irrevocable', 'waive', 'surrender'
-    ]
-    
-    # Check for high-risk terms
-    high_risk_found = [term for term in high_risk_terms if term in text_lower]
-    medium_risk_found = [term for term in medium_risk_terms if term in text_lower]
+    # Check for high-risk and medium-risk terms
+    high_risk_found = [term for term in HIGH_RISK_TERMS if index.contains(term)]
+    medium_risk_found = [term for term in MEDIUM_RISK_TERMS if index.contains(term)]
     
     if high_risk_found:
         risks.append({
@@ -364,7 +328,7 @@ def assess_document_risks(text, doc_type):
         })
     
     # Check for dates and deadlines
-    date_patterns = re.findall(r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b', text)
+    date_patterns = re.findall(r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b', index.text)
     if date_patterns:
         risks.append({
             'level': 'medium',
@@ -375,6 +339,66 @@ def assess_document_risks(text, doc_type):
     
     return risks
 
+# ---------------- Incremental Insights ----------------
+class IncrementalInsights:
+    """Document type, risk terms and fraud score refined as each page is read"""
+
+    def __init__(self):
+        self.pages_read = 0
+        self.type_keywords = set()
+        self.high_risk_found = []
+        self.medium_risk_found = []
+        self.detector = fraud_detector
+        self.fraud_patterns = {
+            'suspicious_phrases': [],
+            'red_flags': [],
+            'urgency_indicators': [],
+            'financial_promises': [],
+            'occurrences': {},
+            'word_count': 0,
+        }
+
+    def add_page(self, text):
+        """Fold one more page of text into the running results"""
+        self.pages_read += 1
+        index = DocumentIndex(text)
+
+        self.type_keywords |= find_type_keywords(index)
+        self.high_risk_found += [t for t in HIGH_RISK_TERMS if index.contains(t) and t not in self.high_risk_found]
+        self.medium_risk_found += [t for t in MEDIUM_RISK_TERMS if index.contains(t) and t not in self.medium_risk_found]
+
+        page_patterns = self.detector.analyze_text_patterns(index)
+        for key in ('suspicious_phrases', 'red_flags'):
+            self.fraud_patterns[key] += [p for p in page_patterns[key] if p not in self.fraud_patterns[key]]
+        for key in ('urgency_indicators', 'financial_promises'):
+            self.fraud_patterns[key] += page_patterns[key]
+        for key, count in page_patterns['occurrences'].items():
+            self.fraud_patterns['occurrences'][key] = self.fraud_patterns['occurrences'].get(key, 0) + count
+        self.fraud_patterns['word_count'] += page_patterns['word_count']
+
+    @property
+    def document_type(self):
+        return document_type_from_keywords(self.type_keywords)
+
+    @property
+    def fraud_score(self):
+        return self.detector.calculate_risk_score(self.fraud_patterns)
+
+def render_incremental_insights(insights, page_count):
+    """Show what we know so far while the rest of the document is read"""
+    _, doc_type_display = insights.document_type
+    risk_terms = insights.high_risk_found + insights.medium_risk_found
+    status = "Finished reading" if page_count and insights.pages_read >= page_count else "Still reading"
+
+    st.markdown(f"""
+    <div class="alert-box alert-info">
+        <strong>{status}: page {insights.pages_read} of {page_count or '?'}</strong><br>
+        Looks like: {doc_type_display}<br>
+        Terms to watch: {', '.join(risk_terms[:6]) if risk_terms else 'none found yet'}<br>
+        Fraud risk score so far: {insights.fraud_score}/100
+    </div>
+    """, unsafe_allow_html=True)
+
 # ---------------- Plain Language Explanations ----------------
 def get_plain_language_explanation(doc_type):
     """Get plain language explanation based on document type"""
@@ -488,109 +512,64 @@ def generate_action_steps(doc_type, risks):
     return base_steps + risk_based_steps
 
 # ---------------- Enhanced Summarizer ----------------
-def simple_text_summarizer(text, max_sentences=5):
-    """Simple rule-based summarizer with more sentences for clarity"""
-    if not text or len(text.strip()) < 100:
-        return text
-    
-    sentences = [s.strip() for s in text.replace('\n', ' ').split('.') if s.strip()]
-    
-    if len(sentences) <= max_sentences:
-        return text
-    
-    # Take more varied sentences for better coverage
-    indices = [0, len(sentences)//4, len(sentences)//2, 3*len(sentences)//4, -1]
-    summary_sentences = [sentences[i] for i in indices if i < len(sentences)]
-    
-    return '. '.join(summary_sentences) + '.'
-
-def summarize_text(text):
-    """Summarize text with fallback options"""
+def summarize_text(document, detailed=False):
+    """Summarize text: key sentences by default, an AI-written summary when detailed is asked for
+    
+    Results are cached by document content, model and settings, so documents
+    many people upload (standard leases, SASSA offers) are only summarised once.
+    """
+    index = as_index(document)
+    text = index.text
     if not text or len(text.strip()) < 50:
         return text
     
+    quick_key = summary_key(text, "textrank", {"sentences": EXTRACTIVE_SENTENCES, "version": TEXTRANK_VERSION})
+    if not detailed:
+        return summary_cache.get_or_compute(quick_key, lambda: textrank_summarize(index))
+    
+    detailed_key = summary_key(text, f"{SUMMARIZATION_MODEL}@{SUMMARIZATION_BACKEND}", {
+        "chunk_tokens": CHUNK_TOKENS,
+        "max_tokens": MAX_SUMMARY_TOKENS,
+        "max_length": SUMMARY_MAX_LENGTH,
+        "min_length": SUMMARY_MIN_LENGTH,
+    })
     try:
-        from transformers import pipeline
-        summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
-        
-        max_length = 1500  # Increased for more comprehensive summary
-        if len(text) > max_length:
-            text = text[:max_length] + "..."
-        
-        summary = summarizer(text, max_length=200, min_length=80, do_sample=False)
-        return summary[0]['summary_text']
+        # Chunks from concurrent requests share forward passes through the batcher
+        return summary_cache.get_or_compute(
+            detailed_key, lambda: map_reduce_summarize(index, summarization_batcher)
+        )
     
-    except ImportError:
-        st.warning("Using simplified summarizer for better accessibility.")
-        return simple_text_summarizer(text, max_sentences=5)
     except Exception as e:
-        st.warning(f"Using simplified summarizer: {str(e)}")
-        return simple_text_summarizer(text, max_sentences=5)
-
-# ---------------- Enhanced Legal Simplification ----------------
-def simplify_legal_text(text):
-    """Convert legal jargon to plain language with expanded dictionary"""
-    replacements = {
-        # Basic legal terms
-        "whereas": "because",
-        "heretofore": "before now",
-        "hereafter": "from now on",
-        "aforementioned": "mentioned above",
-        "pursuant to": "according to",
-        "notwithstanding": "even though",
-        "hereinafter": "from now on called",
-        "therefor": "for that reason",
-        "whereby": "by which",
-        "thereof": "of it",
-        "therein": "in it",
-        "party of the first part": "first party",
-        "party of the second part": "second party",
-        
-        # More complex terms
-        "indemnify": "protect from loss",
-        "covenant": "promise",
-        "remedy": "solution or fix",
-        "breach": "breaking the rules",
-        "default": "failing to pay or do what's required",
-        "liquidated damages": "pre-agreed penalty amount",
-        "force majeure": "uncontrollable events (like natural disasters)",
-        "arbitration": "private court hearing",
-        "jurisdiction": "which court has authority",
-        "severability": "if one part is invalid, the rest still applies",
-        "waiver": "giving up a right",
-        "consideration": "something of value exchanged",
-        "amendment": "change to the agreement",
-        "assignment": "transferring rights to someone else",
-        "subletting": "renting to someone else while you rent",
-        "lien": "legal claim on property",
-        "escrow": "money held by a third party",
-        "pro rata": "proportionally divided"
-    }
-    
-    simplified = text
-    for legal_term, plain_term in replacements.items():
-        # Case-insensitive replacement
-        pattern = re.compile(re.escape(legal_term), re.IGNORECASE)
-        simplified = pattern.sub(plain_term, simplified)
-    
-    return simplified
+        # Runs on a job worker, so fall back quietly and leave a note for operators
+        logging.warning(f"Detailed summary unavailable, using the quick summary: {str(e)}")
+        return summary_cache.get_or_compute(quick_key, lambda: textrank_summarize(index))
+
+def simplify_summary(summary):
+    """Plain-language version of a summary, cached per glossary version"""
+    key = summary_key(summary, "glossary", {"version": jargon_simplifier.version})
+    return summary_cache.get_or_compute(key, lambda: simplify_legal_text(summary))
 
 # ---------------- Audio with Multiple Languages ----------------
+def save_audio_summary(text, language='en'):
+    """Write spoken text to a temporary mp3 file and return its path"""
+    if not text or len(text.strip()) == 0:
+        return None
+        
+    from gtts import gTTS
+    tts = gTTS(text=text, lang=language, slow=False)
+    tmp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3")
+    tts.save(tmp_file.name)
+    return tmp_file.name
+
 def create_audio_summary(text, language='en'):
     """Create audio file from text"""
     try:
-        if not text or len(text.strip()) == 0:
-            return None
-            
-        tts = gTTS(text=text, lang=language, slow=False)
-        tmp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3")
-        tts.save(tmp_file.name)
-        return tmp_file.name
+        return save_audio_summary(text, language)
     except Exception as e:
         st.error(f"Audio generation failed: {str(e)}")
         return None
 
-def play_audio_summary(summary_text):
+def play_audio_summary(summary_text, audio_file_en=None):
     """Play audio summary with multiple language options"""
     st.markdown("### Listen to Your Summary")
     
@@ -598,7 +577,8 @@ def play_audio_summary(summary_text):
     
     with col1:
         st.markdown("**English Audio:**")
-        audio_file_en = create_audio_summary(summary_text, 'en')
+        if audio_file_en is None:
+            audio_file_en = create_audio_summary(summary_text, 'en')
         if audio_file_en:
             st.audio(audio_file_en, format="audio/mp3")
         
@@ -616,6 +596,168 @@ def play_audio_summary(summary_text):
             if audio_file:
                 st.audio(audio_file, format="audio/mp3")
 
+# ---------------- Background Analysis ----------------
+def analyze_document(job, text, detailed=False):
+    """Every analysis step for one document; runs on a job worker, so it makes no Streamlit calls"""
+    with job.step("Understanding your document..."):
+        # Normalised and segmented once, then shared by every step below
+        index = DocumentIndex(text)
+        doc_type, doc_type_display = detect_document_type(index)
+
+    with job.step("Checking for important risks..."):
+        risks = assess_document_risks(index, doc_type)
+
+    with job.step("Creating simple summary..."):
+        summary = summarize_text(index, detailed=detailed)
+        simplified_summary = simplify_summary(summary)
+
+    with job.step("Preparing your action plan..."):
+        explanation = get_plain_language_explanation(doc_type)
+        next_steps = generate_action_steps(doc_type, risks)
+
+    with job.step("Creating audio version..."):
+        try:
+            audio_file = save_audio_summary(simplified_summary, 'en')
+        except Exception as e:
+            logging.warning(f"Audio generation failed: {e}")
+            audio_file = None
+
+    return {
+        "doc_type_display": doc_type_display,
+        "risks": risks,
+        "simplified_summary": simplified_summary,
+        "explanation": explanation,
+        "next_steps": next_steps,
+        "audio_file": audio_file,
+    }
+
+@st.fragment(run_every=ANALYSIS_POLL_SECONDS)
+def show_analysis_progress(job_id):
+    """Redraws itself until the job finishes, then reruns the page to show the result"""
+    job = job_queue.get(job_id)
+    if job is None or job.finished:
+        st.rerun()
+
+    if job.status == QUEUED:
+        st.info(f"Waiting for a free spot... ({job.queue_seconds:.0f}s)")
+    else:
+        create_progress_indicator(job.step_number, job.total_steps)
+        st.markdown(f"**{job.step_label}**")
+
+def render_analysis(result, step_timings):
+    """Show a finished analysis"""
+    doc_type_display = result["doc_type_display"]
+    risks = result["risks"]
+    explanation = result["explanation"]
+    simplified_summary = result["simplified_summary"]
+    next_steps = result["next_steps"]
+
+    st.markdown("---")
+    st.markdown("# Your Document Analysis")
+    
+    # Document type
+    st.markdown(f"""
+    <div class="alert-box alert-info">
+        <strong>Document Type:</strong> {doc_type_display}
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Risk assessment
+    if risks:
+        st.markdown("## Important Warnings")
+        for risk in risks:
+            risk_class = f"risk-{risk['level']}"
+            st.markdown(f"""
+            <div class="risk-indicator {risk_class}">
+                <div>
+                    <strong>{risk['title']}</strong><br>
+                    {risk['description']}<br>
+                    <em>{risk['advice']}</em>
+                </div>
+            </div>
+            """, unsafe_allow_html=True)
+    else:
+        st.markdown("""
+        <div class="risk-indicator risk-low">
+            <strong>No Major Risks Found</strong><br>
+            This document appears to have standard terms, but still read carefully!
+        </div>
+        """, unsafe_allow_html=True)
+    
+    # Plain language explanation
+    st.markdown("## What Is This Document?")
+    st.markdown(f"""
+    <div class="plain-speak">
+        <strong>In Simple Terms:</strong><br>
+        {explanation['what_it_is']}
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Key points
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("### Key Things This Document Covers:")
+        for point in explanation['key_things']:
+            st.markdown(f"• **{point}**")
+    
+    with col2:
+        st.markdown("### Watch Out For:")
+        for warning in explanation['watch_out']:
+            st.markdown(f"• **{warning}**")
+    
+    # Simplified summary
+    st.markdown("## Simple Summary")
+    st.markdown(f"""
+    <div class="plain-speak">
+        {simplified_summary}
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Next steps with enhanced container styling
+    st.markdown("## What Should You Do Next?")
+    
+    # Build the complete HTML string for action steps
+    action_steps_content = ""
+    for i, step in enumerate(next_steps, 1):
+        action_steps_content += f'<div class="action-step"><strong>Step {i}:</strong> {step}</div>'
+    
+    # Create the complete HTML block
+    st.markdown(f"""
+    <div class="next-steps">
+        <h4>Your Action Plan</h4>
+        <p style="margin-bottom: 1.5rem; font-size: 1.1rem; color: #64748B;">
+            Follow these steps to protect yourself and make informed decisions:
+        </p>
+        {action_steps_content}
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Audio section
+    play_audio_summary(simplified_summary, result["audio_file"])
+    
+    # Additional resources with gradient buttons
+    st.markdown("---")
+    st.markdown("## Need More Help?")
+    
+    help_col1, help_col2, help_col3 = st.columns(3)
+    
+    with help_col1:
+        if st.button("Find Legal Aid", help="Find free legal help in your area", key="legal_aid"):
+            st.info("Search for 'legal aid' + your city name, or call 211 for local resources.")
+    
+    with help_col2:
+        if st.button("Common Questions", help="See frequently asked questions", key="faq"):
+            st.info("Check our FAQ section in the sidebar for common concerns!")
+    
+    with help_col3:
+        if st.button("Print Summary", help="Get a printable version", key="print"):
+            st.info("Use your browser's print function to save this analysis!")
+
+    with st.expander("How long each step took", expanded=False):
+        for label, seconds in step_timings:
+            st.caption(f"{label} {seconds:.2f}s")
+
 # ---------------- Main Enhanced App ----------------
 def run():
     st.set_page_config(
@@ -641,200 +783,99 @@ def run():
 
     # File uploader with better instructions
     st.markdown("## Upload Your Document")
-    uploaded_file = st.file_uploader(
+    uploaded_files = st.file_uploader(
         "Choose your document (we keep it private and secure)", 
         type=SUPPORTED_FORMATS,
-        help="We support PDF files, images (JPG, PNG), and text files. Maximum size: 10MB"
+        accept_multiple_files=True,
+        help="We support PDF files, images (JPG, PNG, TIFF), and text files. Maximum size: 10MB per file. "
+             "Took a photo of each page? Select all the photos together and we'll read them as one document."
     )
+    ocr_engine = select_ocr_engine("How should we read photos and scanned pages?", key="summarizer_ocr_engine")
 
-    if uploaded_file is not None:
+    if uploaded_files:
         # File validation
-        if uploaded_file.size > MAX_FILE_SIZE:
+        too_large = [f for f in uploaded_files if f.size > MAX_FILE_SIZE]
+        if too_large:
             st.markdown("""
             <div class="alert-box alert-danger">
                 <strong>File too large!</strong><br>
-                Your file is {:.1f}MB, but we can only handle files up to 10MB. 
+                {} is {:.1f}MB, but we can only handle files up to 10MB. 
                 Try compressing your file or taking a clearer photo.
             </div>
-            """.format(uploaded_file.size/1024/1024), unsafe_allow_html=True)
+            """.format(too_large[0].name, too_large[0].size/1024/1024), unsafe_allow_html=True)
             return
 
+        file_list = "<br>".join(f"File: {f.name} ({f.size/1024:.1f}KB)" for f in uploaded_files)
         st.markdown(f"""
         <div class="alert-box alert-info">
             <strong>File uploaded successfully!</strong><br>
-            File: {uploaded_file.name} ({uploaded_file.size/1024:.1f}KB)
+            {file_list}
         </div>
         """, unsafe_allow_html=True)
 
-        # Extract text
-        with st.spinner("Reading your document..."):
-            extracted_text = ""
-            
-            if uploaded_file.type == "application/pdf":
-                extracted_text = extract_text_from_pdf(uploaded_file)
-            elif uploaded_file.type == "text/plain" or uploaded_file.name.endswith('.txt'):
-                try:
-                    extracted_text = str(uploaded_file.read(), "utf-8")
-                except Exception as e:
-                    st.error(f"Could not read text file: {str(e)}")
-                    return
-            else:
-                try:
-                    image = Image.open(uploaded_file)
-                    st.image(image, caption="Your Document", use_container_width=True)
-                    extracted_text = extract_text_from_image(image)
-                except Exception as e:
-                    st.error(f"Could not read image: {str(e)}")
-                    return
+        # Extract text, showing early insights as each page arrives
+        photos = [f for f in uploaded_files if get_document_kind(f) == "image"]
+        if photos:
+            st.image(photos, caption=[f.name for f in photos], use_container_width=True)
+
+        try:
+            stream = DocumentStream(uploaded_files, ocr_engine=ocr_engine)
+        except ValueError as e:
+            st.error(str(e))
+            return
+
+        reading_progress = st.empty()
+        insights_placeholder = st.empty()
+        insights = IncrementalInsights()
+
+        try:
+            for page in stream:
+                insights.add_page(page.text)
+                reading_progress.progress(
+                    page.number / stream.page_count,
+                    text=f"Reading your document... page {page.number} of {stream.page_count}"
+                )
+                with insights_placeholder.container():
+                    render_incremental_insights(insights, stream.page_count)
+        except Exception as e:
+            st.error(f"Could not read your document: {str(e)}")
+            return
+
+        reading_progress.empty()
+        extracted_text = stream.document.text
 
         if extracted_text and len(extracted_text.strip()) > 0:
             
             # Show the big friendly button with special styling
             st.markdown("---")
+            detailed_summary = st.checkbox(
+                "Write a detailed summary in my own words (slower)",
+                value=False,
+                key="detailed_summary",
+                help="By default we pick out the most important sentences, which takes under a second. "
+                     "A detailed summary is written by an AI model and can take a minute on long documents."
+            )
             if st.button("Explain This Document to Me!", key="main_analyze", help="Click to get a simple explanation"):
-                
-                # Progress tracking
-                progress_container = st.container()
-                
-                with progress_container:
-                    create_progress_indicator(1, 5)
-                    with st.spinner("Understanding your document..."):
-                        # Detect document type
-                        doc_type, doc_type_display = detect_document_type(extracted_text)
-                        time.sleep(0.5)
-                
-                with progress_container:
-                    create_progress_indicator(2, 5)
-                    with st.spinner("Checking for important risks..."):
-                        # Assess risks
-                        risks = assess_document_risks(extracted_text, doc_type)
-                        time.sleep(0.5)
-                
-                with progress_container:
-                    create_progress_indicator(3, 5)
-                    with st.spinner("Creating simple summary..."):
-                        # Generate summaries
-                        summary = summarize_text(extracted_text)
-                        simplified_summary = simplify_legal_text(summary)
-                        time.sleep(0.5)
-                
-                with progress_container:
-                    create_progress_indicator(4, 5)
-                    with st.spinner("Preparing your action plan..."):
-                        # Get explanations and next steps
-                        explanation = get_plain_language_explanation(doc_type)
-                        next_steps = generate_action_steps(doc_type, risks)
-                        time.sleep(0.5)
-                
-                with progress_container:
-                    create_progress_indicator(5, 5)
-                    with st.spinner("Creating audio version..."):
-                        time.sleep(0.3)
-                
-                # Clear progress
-                progress_container.empty()
-                
-                st.markdown("---")
-                st.markdown("# Your Document Analysis")
-                
-                # Document type
-                st.markdown(f"""
-                <div class="alert-box alert-info">
-                    <strong>Document Type:</strong> {doc_type_display}
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Risk assessment
-                if risks:
-                    st.markdown("## Important Warnings")
-                    for risk in risks:
-                        risk_class = f"risk-{risk['level']}"
-                        st.markdown(f"""
-                        <div class="risk-indicator {risk_class}">
-                            <div>
-                                <strong>{risk['title']}</strong><br>
-                                {risk['description']}<br>
-                                <em>{risk['advice']}</em>
-                            </div>
-                        </div>
-                        """, unsafe_allow_html=True)
+                try:
+                    job = job_queue.submit(
+                        "summarizer", analyze_document, extracted_text, detailed_summary,
+                        total_steps=ANALYSIS_STEPS
+                    )
+                except JobQueueFull as e:
+                    st.error(str(e))
+                    return
+                st.session_state["summarizer_job"] = (stream.key, job.id)
+
+            # The analysis runs in the background; find this document's job, if any
+            job_ref = st.session_state.get("summarizer_job")
+            job = job_queue.get(job_ref[1]) if job_ref and job_ref[0] == stream.key else None
+            if job is not None:
+                if not job.finished:
+                    show_analysis_progress(job.id)
+                elif job.status == FAILED:
+                    st.error(f"Could not analyse your document: {job.error}")
                 else:
-                    st.markdown("""
-                    <div class="risk-indicator risk-low">
-                        <strong>No Major Risks Found</strong><br>
-                        This document appears to have standard terms, but still read carefully!
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                # Plain language explanation
-                st.markdown("## What Is This Document?")
-                st.markdown(f"""
-                <div class="plain-speak">
-                    <strong>In Simple Terms:</strong><br>
-                    {explanation['what_it_is']}
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Key points
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    st.markdown("### Key Things This Document Covers:")
-                    for point in explanation['key_things']:
-                        st.markdown(f"• **{point}**")
-                
-                with col2:
-                    st.markdown("### Watch Out For:")
-                    for warning in explanation['watch_out']:
-                        st.markdown(f"• **{warning}**")
-                
-                # Simplified summary
-                st.markdown("## Simple Summary")
-                st.markdown(f"""
-                <div class="plain-speak">
-                    {simplified_summary}
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Next steps with enhanced container styling
-                st.markdown("## What Should You Do Next?")
-                
-                # Build the complete HTML string for action steps
-                action_steps_content = ""
-                for i, step in enumerate(next_steps, 1):
-                    action_steps_content += f'<div class="action-step"><strong>Step {i}:</strong> {step}</div>'
-                
-                # Create the complete HTML block
-                st.markdown(f"""
-                <div class="next-steps">
-                    <h4>Your Action Plan</h4>
-                    <p style="margin-bottom: 1.5rem; font-size: 1.1rem; color: #64748B;">
-                        Follow these steps to protect yourself and make informed decisions:
-                    </p>
-                    {action_steps_content}
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Audio section
-                play_audio_summary(simplified_summary)
-                
-                # Additional resources with gradient buttons
-                st.markdown("---")
-                st.markdown("## Need More Help?")
-                
-                help_col1, help_col2, help_col3 = st.columns(3)
-                
-                with help_col1:
-                    if st.button("Find Legal Aid", help="Find free legal help in your area", key="legal_aid"):
-                        st.info("Search for 'legal aid' + your city name, or call 211 for local resources.")
-                
-                with help_col2:
-                    if st.button("Common Questions", help="See frequently asked questions", key="faq"):
-                        st.info("Check our FAQ section in the sidebar for common concerns!")
-                
-                with help_col3:
-                    if st.button("Print Summary", help="Get a printable version", key="print"):
-                        st.info("Use your browser's print function to save this analysis!")
+                    render_analysis(job.result, job.step_timings)
         
         else:
             st.markdown("""
@@ -851,5 +892,26 @@ def run():
             </div>
             """, unsafe_allow_html=True)
 
+    # Model status for operators: load time and resident memory of the shared model
+    with st.sidebar:
+        with st.expander("Model status", expanded=False):
+            for stats in model_stats():
+                if stats["loaded"]:
+                    st.caption(f"{stats['model']}: loaded in {stats['load_seconds']}s, "
+                               f"+{stats['rss_increase_mb']}MB resident")
+                elif stats["error"]:
+                    st.caption(f"{stats['model']}: unavailable ({stats['error']})")
+                else:
+                    st.caption(f"{stats['model']}: loading in the background")
+            cache = summary_cache.stats()
+            st.caption(f"Summary cache: {cache['hits']} hits, {cache['misses']} misses, "
+                       f"{cache['entries']} entries, {cache['evictions']} evicted")
+            batching = summarization_batcher.stats()
+            st.caption(f"Summaries waiting: {batching['queued']}")
+            st.caption("Batch sizes:")
+            st.json(batching["batch_size"], expanded=False)
+            st.caption("Queue wait (ms):")
+            st.json(batching["queue_wait_ms"], expanded=False)
+
 if __name__ == "__main__":
     run()
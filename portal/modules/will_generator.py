@@ -1,13 +1,12 @@
 import streamlit as st
-from fpdf import FPDF
 import base64
-from gtts import gTTS
 import tempfile
 import os
 from datetime import datetime
 
 # --- PDF GENERATOR ---
 def create_will_pdf(data):
+    from fpdf import FPDF
     pdf = FPDF()
     pdf.add_page()
     
@@ -151,6 +150,7 @@ def download_pdf(pdf):
 # --- AUDIO HELPER ---
 def play_audio(text):
     try:
+        from gtts import gTTS
         tts = gTTS(text=text, lang="en")
         with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as tmp:
             tts.save(tmp.name)
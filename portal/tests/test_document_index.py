@@ -0,0 +1,14 @@
+from utils.document_index import DocumentIndex
+
+
+def test_has_term_matches_words_whole():
+    index = DocumentIndex("The corporate rate is fixed.")
+    assert index.has_term("Rate")
+    assert not index.has_term("orate")
+
+
+def test_has_term_finds_terms_that_are_not_one_token():
+    index = DocumentIndex("Interest of 27.5% a year, or 30%.")
+    assert index.has_term("27.5%")
+    assert index.has_term("30%")
+    assert not index.has_term("25%")
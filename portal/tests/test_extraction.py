@@ -0,0 +1,46 @@
+from utils import extraction
+
+
+class ScannedPage:
+    def get_text(self):
+        return ""
+
+
+class OCRFuture:
+    """An OCR result that is only ready once someone waits for it"""
+
+    def __init__(self, text):
+        self.text = text
+
+    def done(self):
+        return False
+
+    def result(self):
+        return self.text
+
+
+def test_scanned_pages_in_flight_are_capped(monkeypatch):
+    submitted, received = [], []
+
+    def submit_pdf_page(pdf_document, index, dpi, engine):
+        # Every page submitted and not yet handed back is a page image held in memory.
+        assert len(submitted) - len(received) < 4
+        submitted.append(index)
+        return OCRFuture(f"page {index + 1}")
+
+    monkeypatch.setattr(extraction, "submit_pdf_page", submit_pdf_page)
+    for page in extraction.iter_pdf_pages([ScannedPage() for _ in range(20)], ocr_scanned=True, max_in_flight=4):
+        received.append(page)
+
+    assert [page.text for page in received] == [f"page {number}" for number in range(1, 21)]
+    assert [page.number for page in received] == list(range(1, 21))
+
+
+def test_text_pages_pass_scanned_ones_in_order(monkeypatch):
+    class TextPage:
+        def get_text(self):
+            return "A page with a perfectly good text layer."
+
+    monkeypatch.setattr(extraction, "submit_pdf_page", lambda pdf_document, index, dpi, engine: OCRFuture("scanned"))
+    pages = list(extraction.iter_pdf_pages([ScannedPage(), TextPage(), ScannedPage()], ocr_scanned=True, max_in_flight=1))
+    assert [(page.number, page.source) for page in pages] == [(1, "ocr"), (2, "text"), (3, "ocr")]
@@ -0,0 +1,44 @@
+from modules.fraud_checker import EVIDENCE_MAX_EXCERPT_CHARS, fraud_detector, highlight_excerpt
+from utils.document_index import DocumentIndex
+
+FILLER = "The parties record the terms of their agreement in this document. "
+
+
+def evidence(pages):
+    """Evidence windows for a document made of these page texts"""
+    offsets, position = [], 0
+    for number, page in enumerate(pages, start=1):
+        offsets.append((position, number))
+        position += len(page) + 1
+    index = DocumentIndex("\n".join(pages), page_offsets=offsets)
+    return index, fraud_detector.analyze_text_patterns(index)["evidence"]
+
+
+def assert_well_formed(windows):
+    for window in windows:
+        assert all(window['start'] <= match.start and match.end <= window['end'] for match in window['matches'])
+    for previous, window in zip(windows, windows[1:]):
+        assert previous['end'] <= window['start']
+
+
+def test_phrase_across_a_page_break_stays_whole_in_its_excerpt():
+    index, windows = evidence([FILLER * 3 + "Payment by wire", "transfer only. " + FILLER * 3 + "Final notice."])
+    assert_well_formed(windows)
+    crossing = next(match for window in windows for match in window['matches'] if match.key == "wire transfer")
+    window = next(window for window in windows if crossing in window['matches'])
+    assert window['page'] == 1
+    assert "wire\ntransfer" in index.text[window['start']:window['end']]
+    assert "transfer</mark>" in highlight_excerpt(index, window)
+
+
+def test_overlapping_findings_share_one_excerpt():
+    index, windows = evidence([FILLER * 2 + "URGENT ACTION REQUIRED. " + FILLER * 2])
+    assert_well_formed(windows)
+    assert len(windows) == 1
+    assert sorted(match.category for match in windows[0]['matches']) == ["suspicious_phrases", "urgency_indicators"]
+
+
+def test_excerpts_stay_within_the_length_cap():
+    index, windows = evidence([" ".join(["Act now, final notice."] + [FILLER] * 2) * 12])
+    assert_well_formed(windows)
+    assert all(window['end'] - window['start'] <= EVIDENCE_MAX_EXCERPT_CHARS for window in windows)
@@ -0,0 +1,91 @@
+import os
+import shutil
+
+import pytest
+
+from modules.fraud_checker import FraudDetector, risk_level
+from utils.fraud_scoring import FraudScoringModel
+
+TEST_DOCUMENTS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test_documents")
+BANDS = ["LOW", "MEDIUM", "HIGH"]
+# Risk level of each sample under the original additive score; the model may only rank them higher.
+BASELINE_BANDS = {
+    "aggressive_marketing.txt": "MEDIUM",
+    "crypto_scam.txt": "HIGH",
+    "employment_contract.txt": "LOW",
+    "fake_court_order.txt": "HIGH",
+    "fake_legal_notice.txt": "HIGH",
+    "investment_scam.txt": "HIGH",
+    "legitimate_contract.png": "LOW",
+    "poor_contract.txt": "LOW",
+    "rental_agreement.txt": "LOW",
+    "saassa_loan.txt": "HIGH",
+    "service_agreement.txt": "LOW",
+    "suspicious_document.png": "HIGH",
+}
+
+detector = FraudDetector()
+
+
+def score(text):
+    return detector.calculate_risk_score(detector.analyze_text_patterns(text))
+
+
+def read_document(name):
+    if name.endswith(".txt"):
+        with open(os.path.join(TEST_DOCUMENTS, name), encoding="utf-8") as f:
+            return f.read()
+    if shutil.which("tesseract") is None:
+        pytest.skip("OCR needs the tesseract binary")
+    from utils.bulk_screening import LocalUpload
+    from utils.extraction import load_document
+
+    with LocalUpload(os.path.join(TEST_DOCUMENTS, name)) as upload:
+        return load_document(upload).text
+
+
+def test_every_sample_document_has_a_baseline():
+    assert sorted(os.listdir(TEST_DOCUMENTS)) == sorted(BASELINE_BANDS)
+
+
+@pytest.mark.parametrize("name", sorted(BASELINE_BANDS))
+def test_sample_documents_score_at_least_their_baseline_band(name):
+    level = risk_level(score(read_document(name)))
+    assert BANDS.index(level) >= BANDS.index(BASELINE_BANDS[name])
+
+
+def test_advance_fee_scam_without_red_flags_is_high_risk():
+    text = (
+        "Dear friend, you are a lottery winner! To release your inheritance pay the advance fee and "
+        "processing fee by wire transfer. Handling charges and a clearance certificate fee apply. "
+        "Act now, this is your final notice. Verify immediately. Urgent, deadline today, pay immediately."
+    )
+    results = detector.analyze_text_patterns(text)
+    assert not results["red_flags"]
+    assert risk_level(detector.calculate_risk_score(results)) == "HIGH"
+
+
+def test_ordinary_lease_wording_scores_below_the_scams():
+    text = (
+        "This lease agreement is made between the landlord and the tenant. " * 10
+        + "The tenant receives a copy of this lease. Any clause modified must be initialled by both parties. "
+        "An incomplete inspection report will be completed at move-in. "
+        + "Rent is payable monthly on the first day of each month into the landlord's account. " * 10
+    )
+    scams = [name for name, band in BASELINE_BANDS.items() if band == "HIGH" and name.endswith(".txt")]
+    assert risk_level(score(text)) == "LOW"
+    assert score(text) < min(score(read_document(name)) for name in scams)
+
+
+def test_more_findings_never_lower_the_score():
+    model = FraudScoringModel.load()
+    results = {"suspicious_phrases": ["act now"], "red_flags": [], "urgency_indicators": [], "financial_promises": []}
+    results.update(occurrences={"suspicious_phrases": 1}, word_count=300)
+    more_flags = dict(results, red_flags=["copy"], occurrences={"suspicious_phrases": 1, "red_flags": 1})
+    assert model.score(more_flags) >= model.score(results)
+
+
+def test_negative_coefficients_are_rejected():
+    model = FraudScoringModel.load()
+    with pytest.raises(ValueError):
+        FraudScoringModel(model.features, model.means, model.scales, [-1.0] + model.coefficients[1:], model.intercept)
@@ -0,0 +1,45 @@
+from PIL import Image
+
+import utils.text_regions
+from utils import ocr
+
+
+class RegionBackend:
+    supports_regions = True
+
+    def block_to_text(self, image):
+        return ""
+
+
+def region_workers(monkeypatch):
+    """max_workers extract_text_from_image hands to region OCR"""
+    calls = []
+
+    def ocr_text_regions(image, ocr_region, max_workers):
+        calls.append(max_workers)
+        return "text"
+
+    monkeypatch.setattr(utils.text_regions, "ocr_text_regions", ocr_text_regions)
+    monkeypatch.setattr(ocr, "get_backend", lambda engine=None: RegionBackend())
+    ocr.extract_text_from_image(Image.new("L", (200, 100), 255), correct_rotation=False, text_regions=True)
+    return calls
+
+
+def test_regions_use_every_core_in_the_server(monkeypatch):
+    monkeypatch.setattr(ocr, "_inline", False)
+    monkeypatch.setattr(ocr, "available_cpus", lambda: 8)
+    assert region_workers(monkeypatch) == [8]
+
+
+def test_regions_run_serially_in_bulk_screening_workers(monkeypatch):
+    monkeypatch.setattr(ocr, "_inline", True)
+    monkeypatch.setattr(ocr, "available_cpus", lambda: 8)
+    assert region_workers(monkeypatch) == [1]
+
+
+def test_inline_workers_run_submitted_pages_on_the_calling_thread(monkeypatch):
+    import threading
+
+    monkeypatch.setattr(ocr, "_inline", True)
+    future = ocr._submit(lambda engine: threading.get_ident())
+    assert future.result() == threading.get_ident()
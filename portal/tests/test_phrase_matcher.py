@@ -0,0 +1,43 @@
+from utils.phrase_matcher import LexiconMatcher
+
+PHRASES = {
+    "suspicious_phrases": ["urgent action required", "verify immediately", "advance fee", "guaranteed return"],
+    "red_flags": ["copy", "modified"],
+}
+PATTERNS = {"urgency_indicators": [r"\b(?:urgent|immediately|asap|deadline|expires?)\b"]}
+
+
+def found(text):
+    return [(match.category, match.key) for match in LexiconMatcher(PHRASES, PATTERNS).finditer(text)]
+
+
+def test_phrase_and_urgency_word_overlap():
+    assert found("URGENT ACTION REQUIRED") == [
+        ("suspicious_phrases", "urgent action required"),
+        ("urgency_indicators", "urgent"),
+    ]
+
+
+def test_urgency_word_inside_phrase_is_still_counted():
+    assert found("Please verify immediately.") == [
+        ("suspicious_phrases", "verify immediately"),
+        ("urgency_indicators", "immediately"),
+    ]
+
+
+def test_plural_and_inflected_phrases_report_the_lexicon_phrase():
+    assert found("Guaranteed returns, no advance fees. Copies were modified.") == [
+        ("suspicious_phrases", "guaranteed return"),
+        ("suspicious_phrases", "advance fee"),
+        ("red_flags", "modified"),
+    ]
+
+
+def test_phrases_still_match_whole_words_only():
+    assert found("Copyright notice, unmodified") == []
+
+
+def test_matches_are_in_text_order_with_offsets():
+    text = "Deadline: send the advance fee"
+    matches = list(LexiconMatcher(PHRASES, PATTERNS).finditer(text))
+    assert [text[match.start:match.end] for match in matches] == ["Deadline", "advance fee"]
@@ -0,0 +1,45 @@
+from utils.summarization import distinct_sentences, textrank_summarize
+
+CLAUSES = [
+    "The tenant shall pay the monthly rent of R9,500 on the first day of each month.",
+    "The landlord shall keep the roof, walls and plumbing of the premises in good repair.",
+    "The deposit of R19,000 is held in an interest-bearing account for the tenant.",
+    "Either party may cancel the lease on two calendar months' written notice.",
+    "The tenant may not sublet the premises without the landlord's written consent.",
+    "Pets are allowed only with the landlord's prior written approval.",
+    "The tenant is responsible for electricity and water used at the premises.",
+    "The premises shall be inspected jointly at the start and end of the lease.",
+]
+
+
+def lease_bundle():
+    """A lease split over pages, each with the same running header and footer"""
+    pages = []
+    for number, start in enumerate(range(0, len(CLAUSES), 2), start=1):
+        pages.append("\n\n".join(
+            [f"Greenside Properties Lease Agreement Page {number} of 4."]
+            + CLAUSES[start:start + 2]
+            + ["Initial here to confirm that you have read this page."]
+        ))
+    return "\n\n".join(pages)
+
+
+def test_repeated_headers_and_footers_stay_out_of_the_summary():
+    summary = textrank_summarize(lease_bundle(), max_sentences=3)
+    assert "Lease Agreement Page" not in summary
+    assert "Initial here" not in summary
+    assert summary.count(".") == 3
+
+
+def test_repeated_text_is_summarised_once():
+    text = " ".join(CLAUSES[:4] + CLAUSES)
+    summary = textrank_summarize(text, max_sentences=4)
+    sentences = [sentence for sentence in CLAUSES if sentence in summary]
+    assert len(sentences) == 4
+    assert all(summary.count(sentence) == 1 for sentence in sentences)
+
+
+def test_distinct_sentences_keeps_first_occurrences_in_order():
+    assert distinct_sentences(["One two three four.", "Five six seven eight.", "one  TWO three four"]) == [
+        "One two three four.", "Five six seven eight.",
+    ]
@@ -0,0 +1,151 @@
+import bisect
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+from utils.models import summarization_pipeline
+
+# ---------------- Config ----------------
+MAX_BATCH_SIZE = int(os.environ.get("PORTAL_BATCH_MAX_SIZE", "8"))
+# How long the first request in a batch waits for others to join it.
+MAX_WAIT_SECONDS = int(os.environ.get("PORTAL_BATCH_MAX_WAIT_MS", "20")) / 1000
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32]
+QUEUE_WAIT_MS_BUCKETS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000]
+
+
+class Histogram:
+    """Counts of observations per bucket, with running count and mean"""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.bounds, value)] += 1
+            self.count += 1
+            self.total += value
+
+    def to_dict(self):
+        with self._lock:
+            labels = [f"<={bound}" for bound in self.bounds] + [f">{self.bounds[-1]}"]
+            return {
+                "buckets": dict(zip(labels, self.counts)),
+                "count": self.count,
+                "mean": round(self.total / self.count, 2) if self.count else None,
+            }
+
+
+class _Request:
+    def __init__(self, text, params):
+        self.text = text
+        self.params = params
+        self.future = Future()
+        self.enqueued = time.perf_counter()
+
+
+# ---------------- Micro-Batching ----------------
+class MicroBatcher:
+    """Coalesces concurrent calls to a text-to-text pipeline into batched forward passes
+
+    Callers use it like the pipeline itself. Each text joins a shared queue; one
+    dispatcher thread takes up to max_batch_size texts with the same generation
+    settings, waiting at most max_wait for a batch to fill, and runs them together.
+    """
+
+    def __init__(self, get_pipeline, max_batch_size=MAX_BATCH_SIZE, max_wait=MAX_WAIT_SECONDS):
+        self.get_pipeline = get_pipeline
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.queue_wait_ms = Histogram(QUEUE_WAIT_MS_BUCKETS)
+        self._pending = deque()
+        self._condition = threading.Condition()
+        self._dispatcher = None
+
+    @property
+    def tokenizer(self):
+        return getattr(self.get_pipeline(), "tokenizer", None)
+
+    def __call__(self, texts, batch_size=None, **params):
+        """Pipeline-compatible call; batch_size is ignored because the batcher decides"""
+        if isinstance(texts, str):
+            texts = [texts]
+        return [future.result() for future in self.submit(texts, **params)]
+
+    def submit(self, texts, **params):
+        """Queue texts for generation, returning one Future per text"""
+        key = tuple(sorted(params.items()))
+        requests = [_Request(text, key) for text in texts]
+        with self._condition:
+            self._start_dispatcher()
+            self._pending.extend(requests)
+            self._condition.notify()
+        return [request.future for request in requests]
+
+    def stats(self):
+        with self._condition:
+            queued = len(self._pending)
+        return {
+            "queued": queued,
+            "batch_size": self.batch_sizes.to_dict(),
+            "queue_wait_ms": self.queue_wait_ms.to_dict(),
+        }
+
+    def _start_dispatcher(self):
+        if self._dispatcher is None:
+            self._dispatcher = threading.Thread(target=self._dispatch, name="micro-batcher", daemon=True)
+            self._dispatcher.start()
+
+    def _matching(self, key):
+        return sum(1 for request in self._pending if request.params == key)
+
+    def _next_batch(self):
+        with self._condition:
+            self._condition.wait_for(lambda: self._pending)
+            key = self._pending[0].params
+            deadline = self._pending[0].enqueued + self.max_wait
+            while self._matching(key) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+
+            batch, rest = [], deque()
+            for request in self._pending:
+                if request.params == key and len(batch) < self.max_batch_size:
+                    batch.append(request)
+                else:
+                    rest.append(request)
+            self._pending = rest
+        return batch
+
+    def _dispatch(self):
+        while True:
+            batch = self._next_batch()
+            started = time.perf_counter()
+            for request in batch:
+                self.queue_wait_ms.observe((started - request.enqueued) * 1000)
+            self.batch_sizes.observe(len(batch))
+
+            try:
+                results = self.get_pipeline()(
+                    [request.text for request in batch], batch_size=len(batch), **dict(batch[0].params)
+                )
+            except Exception as e:
+                logging.warning(f"Batched generation of {len(batch)} texts failed: {e}")
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+
+            for request, result in zip(batch, results):
+                request.future.set_result(result)
+
+
+summarization_batcher = MicroBatcher(summarization_pipeline)
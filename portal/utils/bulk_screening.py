@@ -0,0 +1,221 @@
+"""Screen a folder or ZIP of documents for fraud and write a report.
+
+Documents are extracted in worker processes across all available cores,
+scored in batches as they finish, and printed as soon as they are scored.
+Run from the portal directory:
+
+    python -m utils.bulk_screening ~/intake/2025-03-14 --output report.csv
+    python -m utils.bulk_screening letters.zip scans/ --output report.parquet --workers 4
+"""
+import argparse
+import io
+import mimetypes
+import os
+import tempfile
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from utils.extraction import IMAGE_EXTENSIONS, PDF_EXTENSIONS, TEXT_EXTENSIONS
+from utils.ocr import available_cpus, init_inline_ocr_worker
+
+# ---------------- Config ----------------
+SCREENED_EXTENSIONS = set(PDF_EXTENSIONS + IMAGE_EXTENSIONS + TEXT_EXTENSIONS)
+MAX_BULK_DOCUMENTS = int(os.environ.get("PORTAL_MAX_BULK_DOCUMENTS", "500"))
+MAX_BULK_FILE_BYTES = 10 * 1024 * 1024
+# Distinct findings listed per document in the report.
+REPORT_FINDINGS = 5
+REPORT_COLUMNS = [
+    "document", "risk_score", "risk_level", "pages", "words",
+    "suspicious_phrases", "red_flags", "urgency_indicators", "financial_promises",
+    "findings", "first_finding_page", "seconds", "error", "lexicon_version",
+]
+
+
+class LocalUpload(io.FileIO):
+    """A file on disk with the name, type and size of a Streamlit upload"""
+
+    def __init__(self, path, name=None):
+        super().__init__(path, "rb")
+        self.name = name or os.path.basename(path)
+        self.type = mimetypes.guess_type(self.name)[0] or ""
+        self.size = os.path.getsize(path)
+
+
+# ---------------- Collecting Documents ----------------
+def is_screened(name):
+    extension = os.path.splitext(name)[1].lower().lstrip(".")
+    return extension in SCREENED_EXTENSIONS and not os.path.basename(name).startswith(".")
+
+
+def unpack_zip(zip_file, directory):
+    """Write a ZIP's documents into directory, returning (name inside the ZIP, path) pairs
+
+    Members are written under generated file names, never their own paths,
+    so a crafted ZIP cannot write outside directory.
+    """
+    documents = []
+    with zipfile.ZipFile(zip_file) as archive:
+        for member in archive.infolist():
+            if member.is_dir() or member.filename.startswith("__MACOSX/") or not is_screened(member.filename):
+                continue
+            if len(documents) >= MAX_BULK_DOCUMENTS:
+                raise ValueError(f"The ZIP holds more than {MAX_BULK_DOCUMENTS} documents.")
+            if member.file_size > MAX_BULK_FILE_BYTES:
+                documents.append((member.filename, None))
+                continue
+            path = os.path.join(directory, f"{len(documents):05d}{os.path.splitext(member.filename)[1].lower()}")
+            with archive.open(member) as source, open(path, "wb") as target:
+                while chunk := source.read(1024 * 1024):
+                    target.write(chunk)
+            documents.append((member.filename, path))
+    return documents
+
+
+def collect_documents(paths, directory):
+    """(name, path) for every document in the given files, folders and ZIPs"""
+    documents = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                documents += [
+                    (os.path.relpath(os.path.join(root, name), path), os.path.join(root, name))
+                    for name in sorted(files) if is_screened(name)
+                ]
+        elif zipfile.is_zipfile(path):
+            unpacked = tempfile.mkdtemp(dir=directory)
+            documents += [(f"{os.path.basename(path)}/{name}", member) for name, member in unpack_zip(path, unpacked)]
+        else:
+            documents.append((os.path.basename(path), path))
+    return documents
+
+
+# ---------------- Screening ----------------
+def screen_document(name, path, ocr_engine=None):
+    """Worker entry point: extract and analyse one document
+
+    Returns its report row, still unscored, and the pattern counts the
+    scoring model needs (None when the document could not be read).
+    """
+    from modules.fraud_checker import RISK_CATEGORIES, fraud_detector
+    from utils.document_index import DocumentIndex
+    from utils.extraction import load_document
+
+    row = {column: None for column in REPORT_COLUMNS}
+    row["document"] = name
+    scoring_input = None
+    start = time.perf_counter()
+    try:
+        if path is None or os.path.getsize(path) > MAX_BULK_FILE_BYTES:
+            raise ValueError(f"File larger than {MAX_BULK_FILE_BYTES // (1024 * 1024)}MB")
+        with LocalUpload(path, name) as upload:
+            document = load_document(upload, ocr_engine=ocr_engine)
+        if not document.text.strip():
+            raise ValueError("No readable text")
+        patterns = fraud_detector.analyze_text_patterns(DocumentIndex(document.text, page_offsets=document.page_offsets))
+        row.update({
+            "pages": document.page_count,
+            "words": patterns["word_count"],
+            "findings": ", ".join(list(dict.fromkeys(match.key for match in patterns["matches"]))[:REPORT_FINDINGS]),
+            "first_finding_page": patterns["matches"][0].page if patterns["matches"] else None,
+            "lexicon_version": patterns["lexicon_version"],
+        })
+        for category in RISK_CATEGORIES:
+            row[category] = patterns["occurrences"].get(category, 0)
+        # Only what the scoring model reads goes back to the parent, not every match.
+        scoring_input = {key: patterns[key] for key in RISK_CATEGORIES + ("occurrences", "word_count")}
+    except Exception as e:
+        row["error"] = str(e) or type(e).__name__
+    row["seconds"] = round(time.perf_counter() - start, 3)
+    return row, scoring_input
+
+
+def screen_documents(documents, ocr_engine=None, max_workers=None):
+    """Yield a report row for each (name, path) as soon as it is screened, across all cores
+
+    Each worker process extracts one document at a time and OCRs its pages
+    inline (see init_inline_ocr_worker), so N workers use N cores rather than
+    N OCR pools. With EasyOCR every worker loads its own Reader, a few hundred
+    MB each; pass fewer max_workers on small machines. Whatever has finished
+    is scored together with one calculate_risk_scores call.
+    """
+    from modules.fraud_checker import fraud_detector, risk_level
+
+    with ProcessPoolExecutor(max_workers=max_workers or available_cpus(), initializer=init_inline_ocr_worker) as pool:
+        pending = {pool.submit(screen_document, name, path, ocr_engine): name for name, path in documents}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            rows, scoring_inputs = [], []
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    row, scoring_input = future.result()
+                except Exception as e:
+                    # The worker itself died (e.g. out of memory), not just the extraction.
+                    row = {column: None for column in REPORT_COLUMNS}
+                    row.update({"document": name, "error": str(e) or type(e).__name__})
+                    scoring_input = None
+                rows.append(row)
+                scoring_inputs.append(scoring_input)
+
+            scored = [(row, scoring_input) for row, scoring_input in zip(rows, scoring_inputs) if scoring_input]
+            scores = fraud_detector.calculate_risk_scores([scoring_input for _, scoring_input in scored])
+            for (row, _), score in zip(scored, scores):
+                row["risk_score"] = score
+                row["risk_level"] = risk_level(score)
+            yield from rows
+
+
+# ---------------- Reports ----------------
+def report_frame(rows):
+    """Rows as a DataFrame, riskiest first and failures last"""
+    import pandas as pd
+
+    frame = pd.DataFrame(rows, columns=REPORT_COLUMNS)
+    return frame.sort_values(["risk_score", "document"], ascending=[False, True], na_position="last", ignore_index=True)
+
+
+def report_bytes(rows, report_format):
+    """The report as CSV or Parquet file contents"""
+    frame = report_frame(rows)
+    if report_format == "csv":
+        return frame.to_csv(index=False).encode("utf-8")
+    if report_format == "parquet":
+        buffer = io.BytesIO()
+        frame.to_parquet(buffer, index=False)
+        return buffer.getvalue()
+    raise ValueError(f"Unknown report format {report_format!r}; expected 'csv' or 'parquet'")
+
+
+def write_report(rows, path):
+    """Write the report, choosing CSV or Parquet from the file extension"""
+    report_format = "parquet" if path.lower().endswith(".parquet") else "csv"
+    with open(path, "wb") as f:
+        f.write(report_bytes(rows, report_format))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="documents, folders of documents, or ZIP files")
+    parser.add_argument("--output", default="fraud_screening.csv", help="report path ending in .csv or .parquet")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--ocr-engine", default=None)
+    args = parser.parse_args()
+
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        documents = collect_documents(args.paths, directory)
+        print(f"Screening {len(documents)} documents")
+        for row in screen_documents(documents, ocr_engine=args.ocr_engine, max_workers=args.workers):
+            rows.append(row)
+            result = f"{row['risk_score']:>3} {row['risk_level']:<6}" if row["error"] is None else f"  - {'ERROR':<6}"
+            print(f"[{len(rows)}/{len(documents)}] {result} {row['document']}" + (f"  ({row['error']})" if row["error"] else ""))
+
+    write_report(rows, args.output)
+    flagged = sum(1 for row in rows if row["risk_level"] == "HIGH")
+    print(f"\n{flagged} of {len(rows)} documents are high risk. Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+import bisect
+import re
+from collections import defaultdict
+
+# ---------------- Normalisation ----------------
+# One character in, one character out, so offsets into the index are offsets into the extracted text.
+_CHARACTER_MAP = str.maketrans({
+    "\u00a0": " ", "\u2007": " ", "\u202f": " ", "\t": " ", "\r": "\n", "\f": "\n",
+    "\u2018": "'", "\u2019": "'", "\u201a": "'", "\u201c": '"', "\u201d": '"', "\u201e": '"',
+    "\u2010": "-", "\u2011": "-", "\u2012": "-", "\u2013": "-", "\u2014": "-", "\u2212": "-",
+    "\u2026": ".",
+})
+
+# Words that end in a full stop without ending the sentence.
+ABBREVIATIONS = {
+    "pty", "ltd", "co", "inc", "corp", "no", "nos", "nr", "mr", "mrs", "ms", "dr", "prof", "adv",
+    "st", "rd", "ave", "vs", "v", "etc", "e.g", "i.e", "cf", "art", "arts", "sec", "secs", "s",
+    "reg", "regs", "par", "para", "cl", "ch", "vol", "pp", "p", "jan", "feb", "mar", "apr", "jun",
+    "jul", "aug", "sep", "sept", "oct", "nov", "dec", "tel", "ref", "approx", "est", "max", "min",
+}
+
+# Candidate sentence ends: terminal punctuation, optional closing quote or bracket, then whitespace
+# before something that can start a sentence. Amounts like R1,207.00 and section numbers like 3.2
+# have no whitespace after the dot, so they never qualify.
+_SENTENCE_END = re.compile(r'[.!?]+["\')\]]*(?=\s+["\'(\[]?[A-Z0-9])')
+_PARAGRAPH_BREAK = re.compile(r'\n[ ]*\n\s*')
+# A line that starts a list item or heading also starts a sentence.
+_LIST_ITEM = re.compile(r'\n(?=[ ]*(?:\d+(?:\.\d+)*[.)]|\(?[a-z]{1,3}\)|[-*\u2022])\s)')
+_CLAUSE_BREAK = re.compile(r';\s+|\n')
+_TOKEN = re.compile(r"[a-z0-9]+(?:['\-./][a-z0-9]+)*")
+_LAST_WORD = re.compile(r"([A-Za-z][A-Za-z.]*)$")
+_ENUMERATION = re.compile(r"^\s*(?:\(?\d+(?:\.\d+)*|\(?[a-z]{1,3}|[ivxlc]+)[.)]?$", re.IGNORECASE)
+
+
+def normalise_text(text):
+    """Unify quotes, dashes and unusual spaces without changing the text's length"""
+    return text.translate(_CHARACTER_MAP)
+
+
+def _lower_same_length(text):
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    # A few characters (e.g. dotted capital I) lower-case to two; keep those as they are.
+    return "".join(c.lower() if len(c.lower()) == 1 else c for c in text)
+
+
+class Span:
+    """A stretch of the document: its text and where it sits"""
+
+    def __init__(self, text, start, end):
+        self.text = text
+        self.start = start
+        self.end = end
+
+    def __repr__(self):
+        return f"Span({self.start}, {self.end}, {self.text[:40]!r})"
+
+
+def _is_sentence_end(text, start, end):
+    """Whether the punctuation just before end closes the sentence that began at start"""
+    candidate = text[start:end].rstrip("\"')]")
+    if not candidate.endswith("."):
+        return True
+    body = candidate.rstrip(".")
+    if _ENUMERATION.match(body):
+        # "3." or "(b)" on its own is a list marker, not a sentence.
+        return False
+    match = _LAST_WORD.search(body)
+    if not match:
+        return True
+    word = match.group(1).lower()
+    # Initials such as "J." and known abbreviations such as "Pty." do not end sentences.
+    return not (len(word) == 1 or word in ABBREVIATIONS)
+
+
+def segment_sentences(text, offset=0):
+    """Sentences of text as Spans, split on sentence ends, paragraph breaks and list items"""
+    spans = []
+    boundaries = sorted(
+        [(m.start(), m.end()) for m in _PARAGRAPH_BREAK.finditer(text)]
+        + [(m.start(), m.end()) for m in _LIST_ITEM.finditer(text)]
+    )
+    block_start = 0
+    for block_end, next_start in boundaries + [(len(text), len(text))]:
+        if block_end < block_start:
+            continue
+        sentence_start = block_start
+        for match in _SENTENCE_END.finditer(text, block_start, block_end):
+            if _is_sentence_end(text, sentence_start, match.end()):
+                spans.append((sentence_start, match.end()))
+                sentence_start = match.end()
+        spans.append((sentence_start, block_end))
+        block_start = next_start
+
+    sentences = []
+    for start, end in spans:
+        # Trim surrounding whitespace while keeping offsets exact.
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if start < end:
+            sentences.append(Span(text[start:end], start + offset, end + offset))
+    return sentences
+
+
+def segment_clauses(sentence):
+    """A sentence split at semicolons and line breaks"""
+    clauses = []
+    start = 0
+    for match in list(_CLAUSE_BREAK.finditer(sentence.text)) + [None]:
+        end = match.start() if match else len(sentence.text)
+        piece = sentence.text[start:end]
+        stripped = piece.strip()
+        if stripped:
+            lead = len(piece) - len(piece.lstrip())
+            clause_start = sentence.start + start + lead
+            clauses.append(Span(stripped, clause_start, clause_start + len(stripped)))
+        if match:
+            start = match.end()
+    return clauses
+
+
+# ---------------- Shared Index ----------------
+class DocumentIndex:
+    """One document prepared once for every analyzer
+
+    Holds the normalised text and its lower-cased form (same length, so
+    offsets agree with the extracted text), sentences and clauses with
+    character offsets, and an index of word tokens. Segmentation and
+    tokenisation happen on first use and are then shared. Given the page
+    offsets of an ExtractedDocument, it can also say which page an offset
+    falls on.
+    """
+
+    def __init__(self, text, page_offsets=None):
+        self.text = normalise_text(text or "")
+        self.lower = _lower_same_length(self.text)
+        self._page_starts = [start for start, _ in page_offsets or []]
+        self._page_numbers = [number for _, number in page_offsets or []]
+        self._sentences = None
+        self._sentence_starts = None
+        self._clauses = None
+        self._tokens = None
+        self._token_positions = None
+
+    def __len__(self):
+        return len(self.text)
+
+    @property
+    def sentences(self):
+        if self._sentences is None:
+            self._sentences = segment_sentences(self.text)
+        return self._sentences
+
+    @property
+    def clauses(self):
+        if self._clauses is None:
+            self._clauses = [clause for sentence in self.sentences for clause in segment_clauses(sentence)]
+        return self._clauses
+
+    @property
+    def tokens(self):
+        """Lower-cased word tokens as Spans, in document order"""
+        if self._tokens is None:
+            self._tokens = [Span(m.group(), m.start(), m.end()) for m in _TOKEN.finditer(self.lower)]
+        return self._tokens
+
+    @property
+    def token_positions(self):
+        """token -> indexes into tokens where it occurs"""
+        if self._token_positions is None:
+            positions = defaultdict(list)
+            for i, token in enumerate(self.tokens):
+                positions[token.text].append(i)
+            self._token_positions = dict(positions)
+        return self._token_positions
+
+    def contains(self, phrase):
+        """Substring test on the lower-cased text, as the analyzers have always matched"""
+        return phrase in self.lower
+
+    def has_word(self, word):
+        """Whether a whole word occurs as a token"""
+        return word.lower() in self.token_positions
+
+    def has_term(self, term):
+        """Whole-word lookup for a term that is one token, substring search for anything else (e.g. "27.5%")"""
+        if _TOKEN.fullmatch(term.lower()):
+            return self.has_word(term)
+        return self.contains(term.lower())
+
+    def sentence_at(self, offset):
+        """The sentence containing a character offset, or None"""
+        if self._sentence_starts is None:
+            self._sentence_starts = [sentence.start for sentence in self.sentences]
+        i = bisect.bisect_right(self._sentence_starts, offset) - 1
+        if i >= 0 and offset < self.sentences[i].end:
+            return self.sentences[i]
+        return None
+
+
+    def page_at(self, offset):
+        """The number of the page a character offset falls on, or None without page offsets"""
+        i = bisect.bisect_right(self._page_starts, offset) - 1
+        return self._page_numbers[max(i, 0)] if self._page_numbers else None
+
+    def page_bounds(self, offset):
+        """(start, end) of the page a character offset falls on; the whole text without page offsets"""
+        i = bisect.bisect_right(self._page_starts, offset)
+        start = self._page_starts[i - 1] if i > 0 else 0
+        end = self._page_starts[i] if i < len(self._page_starts) else len(self.text)
+        return start, end
+
+
+def as_index(document):
+    """Accept either raw text or an already built DocumentIndex"""
+    return document if isinstance(document, DocumentIndex) else DocumentIndex(document)
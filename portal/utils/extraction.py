@@ -0,0 +1,295 @@
+import hashlib
+import logging
+import os
+from collections import deque
+from contextlib import ExitStack
+
+from utils.extraction_cache import digest_key, extraction_cache
+from utils.ingestion import SpooledUpload, hash_upload, memory_budget, track_peak_rss
+from utils.ocr import (OCR_DPI, available_cpus, count_frames, extract_text_from_image, needs_ocr, open_image,
+                       submit_image_frame, submit_pdf_page)
+from utils.ocr_backends import get_backend
+
+# ---------------- Config ----------------
+PDF_EXTENSIONS = ["pdf"]
+IMAGE_EXTENSIONS = ["jpg", "jpeg", "png", "webp", "tif", "tiff"]
+TEXT_EXTENSIONS = ["txt"]
+# Bump whenever extraction output changes so cached results are not reused.
+EXTRACTOR_VERSION = 5
+# OCR PDF pages that have no text layer (scanned or photographed documents).
+OCR_SCANNED_PDFS = os.environ.get("PORTAL_OCR_SCANNED_PDFS", "1") == "1"
+# Rough working-memory multipliers used to reserve from the memory budget.
+PDF_MEMORY_FACTOR = 3
+TEXT_MEMORY_FACTOR = 5
+IMAGE_MEMORY_FACTOR = 3
+# Scanned PDF pages rasterised and queued for OCR at once, per core. Each one holds
+# a page image in memory, so a long scan is read ahead this far and no further.
+OCR_PAGES_IN_FLIGHT_PER_CPU = 2
+
+
+# ---------------- Extraction Results ----------------
+class PageText:
+    """Text extracted from a single page (or image frame) of a document"""
+
+    def __init__(self, number, text, source="text"):
+        self.number = number
+        self.text = text
+        self.source = source
+
+    def __repr__(self):
+        return f"PageText(number={self.number}, source={self.source!r}, chars={len(self.text)})"
+
+    def to_dict(self):
+        return {"number": self.number, "text": self.text, "source": self.source}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["number"], data["text"], data.get("source", "text"))
+
+
+class ExtractedDocument:
+    """All pages extracted from one uploaded file"""
+
+    def __init__(self, name, kind, pages):
+        self.name = name
+        self.kind = kind
+        self.pages = pages
+
+    @property
+    def page_count(self):
+        return len(self.pages)
+
+    @property
+    def text(self):
+        return "\n".join(page.text for page in self.pages).strip()
+
+    @property
+    def page_offsets(self):
+        """(offset in text, page number) where each page starts, in page order"""
+        joined = "\n".join(page.text for page in self.pages)
+        # text strips the joined pages, so everything shifts left by the leading whitespace.
+        lead = len(joined) - len(joined.lstrip())
+        offsets, position = [], 0
+        for page in self.pages:
+            offsets.append((max(position - lead, 0), page.number))
+            position += len(page.text) + 1
+        return offsets
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "pages": [page.to_dict() for page in self.pages],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["name"], data["kind"], [PageText.from_dict(page) for page in data["pages"]])
+
+
+# ---------------- File Type Detection ----------------
+def get_document_kind(uploaded_file):
+    """Classify an upload as 'pdf', 'text' or 'image'"""
+    extension = os.path.splitext(uploaded_file.name)[1].lower().lstrip(".")
+    if uploaded_file.type == "application/pdf" or extension in PDF_EXTENSIONS:
+        return "pdf"
+    if uploaded_file.type == "text/plain" or extension in TEXT_EXTENSIONS:
+        return "text"
+    return "image"
+
+
+# ---------------- PDF ----------------
+def iter_pdf_pages(pdf_document, ocr_scanned=OCR_SCANNED_PDFS, dpi=OCR_DPI, engine=None, max_in_flight=None):
+    """Yield the pages of an open PDF in order, as soon as each one is ready
+
+    Pages with a text layer are ready immediately. Scanned pages are queued on
+    the OCR pool while later pages are read, so OCR runs in parallel and the
+    caller still receives pages in order. At most max_in_flight scanned pages
+    (by default OCR_PAGES_IN_FLIGHT_PER_CPU per core) are rasterised and
+    waiting at once; reading ahead pauses until the oldest one is done.
+    """
+    max_in_flight = max_in_flight or OCR_PAGES_IN_FLIGHT_PER_CPU * available_cpus()
+    pending = deque()
+    in_flight = 0
+
+    for index, page in enumerate(pdf_document):
+        text = page.get_text()
+        if ocr_scanned and needs_ocr(text):
+            while in_flight >= max_in_flight:
+                index_done, text_done, future = pending.popleft()
+                in_flight -= future is not None
+                yield _finish_page(index_done, text_done, future)
+            pending.append((index, text, submit_pdf_page(pdf_document, index, dpi, engine)))
+            in_flight += 1
+        else:
+            pending.append((index, text, None))
+
+        while pending and (pending[0][2] is None or pending[0][2].done()):
+            in_flight -= pending[0][2] is not None
+            yield _finish_page(*pending.popleft())
+
+    while pending:
+        yield _finish_page(*pending.popleft())
+
+
+def _finish_page(index, text, ocr_future):
+    if ocr_future is None:
+        return PageText(index + 1, text)
+    try:
+        return PageText(index + 1, ocr_future.result(), source="ocr")
+    except Exception as e:
+        logging.warning(f"OCR of PDF page {index + 1} failed, keeping text layer only: {e}")
+        return PageText(index + 1, text)
+
+
+def extract_pdf_pages(pdf_path, ocr_scanned=OCR_SCANNED_PDFS, dpi=OCR_DPI, engine=None):
+    """Extract every page of a PDF file, OCRing pages without a text layer"""
+    import fitz  # PyMuPDF
+
+    with fitz.open(pdf_path) as pdf_document:
+        return list(iter_pdf_pages(pdf_document, ocr_scanned, dpi, engine))
+
+
+# ---------------- Images ----------------
+def iter_image_pages(paths, engine=None):
+    """Yield one page per image frame across several files, OCRed in parallel
+
+    A single frame is OCRed in this process with region-level parallelism.
+    Several frames (a multi-page TIFF or a batch of photos) are spread over
+    the OCR worker pool and yielded in order, so the batch takes about as
+    long as its slowest frames rather than the sum of all of them.
+    """
+    frames = [(path, index) for path in paths for index in range(count_frames(path))]
+
+    if len(frames) == 1:
+        with open_image(frames[0][0]) as image:
+            yield PageText(1, extract_text_from_image(image, engine=engine), source="ocr")
+        return
+
+    futures = [submit_image_frame(path, index, engine) for path, index in frames]
+    for number, future in enumerate(futures, start=1):
+        try:
+            yield PageText(number, future.result(), source="ocr")
+        except Exception as e:
+            logging.warning(f"OCR of image page {number} failed: {e}")
+            yield PageText(number, "", source="ocr")
+
+
+# ---------------- Plain Text ----------------
+def decode_text(data):
+    """Decode an uploaded text file, tolerating stray non-UTF-8 bytes"""
+    try:
+        return str(data, "utf-8")
+    except UnicodeDecodeError:
+        return data.decode("utf-8", errors="ignore")
+
+
+# ---------------- Public Entry Points ----------------
+class DocumentStream:
+    """Iterate over the pages of an upload as they are extracted
+
+    uploads is one uploaded file, or a list of them. Several image uploads
+    (photos of each page of a contract) are treated as one document.
+
+    page_count is known once iteration has started, and document holds the
+    complete ExtractedDocument once iteration has finished. Finished documents
+    are stored in the extraction cache, and cached documents are replayed
+    without extracting again.
+
+    Uploads are hashed in chunks and, on a cache miss, spooled to temporary
+    files so PyMuPDF and PIL read from disk instead of from another in-memory
+    copy. Extraction reserves its estimated working memory from the process
+    memory budget and records peak RSS while it runs.
+    """
+
+    def __init__(self, uploads, use_cache=True, ocr_engine=None):
+        self.uploads = list(uploads) if isinstance(uploads, (list, tuple)) else [uploads]
+        if not self.uploads:
+            raise ValueError("No document was uploaded.")
+
+        kinds = {get_document_kind(upload) for upload in self.uploads}
+        if len(self.uploads) > 1 and kinds != {"image"}:
+            raise ValueError("Only photos or scans can be combined into one document. "
+                             "Please upload PDF and text files one at a time.")
+
+        self.kind = kinds.pop()
+        self.name = self.uploads[0].name
+        if len(self.uploads) > 1:
+            self.name += f" (+{len(self.uploads) - 1} more)"
+        self.use_cache = use_cache
+        self.ocr_engine = get_backend(ocr_engine).name
+        self.key = digest_key(self._content_digest(), f"{EXTRACTOR_VERSION}-{self.ocr_engine}")
+        self.page_count = None
+        self.document = None
+        self.metrics = None
+
+    def _content_digest(self):
+        digests = [hash_upload(upload) for upload in self.uploads]
+        if len(digests) == 1:
+            return digests[0]
+        return hashlib.sha256("".join(digests).encode("ascii")).hexdigest()
+
+    def __iter__(self):
+        cached = extraction_cache.get(self.key) if self.use_cache else None
+        if cached is not None:
+            document = ExtractedDocument.from_dict(cached)
+            document.name = self.name
+            self.page_count = document.page_count
+            self.document = document
+            yield from document.pages
+            return
+
+        pages = []
+        with ExitStack() as stack:
+            spooled = [stack.enter_context(SpooledUpload(upload)) for upload in self.uploads]
+            stack.enter_context(memory_budget.reserve(sum(self._estimate_memory(s) for s in spooled)))
+            self.metrics = stack.enter_context(track_peak_rss(self.name))
+
+            for page in self._extract_pages([s.path for s in spooled]):
+                pages.append(page)
+                yield page
+
+        self.document = ExtractedDocument(self.name, self.kind, pages)
+        if self.use_cache:
+            extraction_cache.put(self.key, self.document.to_dict())
+
+    def _estimate_memory(self, spooled):
+        if self.kind == "pdf":
+            return spooled.size * PDF_MEMORY_FACTOR
+        if self.kind == "text":
+            return spooled.size * TEXT_MEMORY_FACTOR
+        with open_image(spooled.path) as image:
+            width, height = image.size
+            frames = getattr(image, "n_frames", 1)
+        return width * height * len(image.getbands()) * IMAGE_MEMORY_FACTOR * frames
+
+    def _extract_pages(self, paths):
+        if self.kind == "pdf":
+            import fitz  # PyMuPDF
+
+            with fitz.open(paths[0]) as pdf_document:
+                self.page_count = pdf_document.page_count
+                yield from iter_pdf_pages(pdf_document, engine=self.ocr_engine)
+        elif self.kind == "text":
+            self.page_count = 1
+            with open(paths[0], "rb") as f:
+                yield PageText(1, decode_text(f.read()))
+        else:
+            self.page_count = sum(count_frames(path) for path in paths)
+            yield from iter_image_pages(paths, engine=self.ocr_engine)
+
+
+def extract_document(uploads, ocr_engine=None):
+    """Extract all pages from an uploaded PDF, text file, or one or more images"""
+    stream = DocumentStream(uploads, use_cache=False, ocr_engine=ocr_engine)
+    for _ in stream:
+        pass
+    return stream.document
+
+
+def load_document(uploads, ocr_engine=None):
+    """Extract an upload, reusing cached text for content seen before"""
+    stream = DocumentStream(uploads, ocr_engine=ocr_engine)
+    for _ in stream:
+        pass
+    return stream.document
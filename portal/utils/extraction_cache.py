@@ -0,0 +1,116 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+# ---------------- Config ----------------
+# Set PORTAL_CACHE_DIR to keep extracted text on disk across server restarts.
+CACHE_DIR = os.environ.get("PORTAL_CACHE_DIR")
+CACHE_MEMORY_BYTES = int(os.environ.get("PORTAL_CACHE_MEMORY_MB", "64")) * 1024 * 1024
+
+
+def digest_key(sha256_hex, version):
+    """Cache key for a document: SHA-256 of its bytes plus the extractor version"""
+    return f"{sha256_hex}-v{version}"
+
+# ---------------- Two-Tier Cache ----------------
+class ExtractionCache:
+    """LRU cache of extracted documents bounded by bytes, with an optional disk tier"""
+
+    def __init__(self, max_bytes=CACHE_MEMORY_BYTES, cache_dir=CACHE_DIR):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+        payload = self._read_disk(key)
+        if payload is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        self._remember(key, payload)
+        return payload
+
+    def put(self, key, payload):
+        self._remember(key, payload)
+        self._write_disk(key, payload)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    # ---------------- Memory Tier ----------------
+    def _remember(self, key, payload):
+        size = len(json.dumps(payload).encode("utf-8"))
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (payload, size)
+            self.current_bytes += size
+
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+
+    # ---------------- Disk Tier ----------------
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _read_disk(self, key):
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable extraction cache entry {key}: {e}")
+            return None
+
+    def _write_disk(self, key, payload):
+        if not self.cache_dir:
+            return
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            logging.warning(f"Could not write extraction cache entry {key}: {e}")
+
+
+extraction_cache = ExtractionCache()
@@ -0,0 +1,121 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+import yaml
+
+from utils.phrase_matcher import LexiconMatcher
+
+# ---------------- Config ----------------
+# One or more lexicon files, separated by os.pathsep; later files add to earlier ones.
+FRAUD_LEXICON_PATHS = os.environ.get(
+    "PORTAL_FRAUD_LEXICON_PATHS",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "fraud_lexicon.yaml"),
+).split(os.pathsep)
+# How often, at most, the files are checked for changes.
+LEXICON_CHECK_SECONDS = float(os.environ.get("PORTAL_LEXICON_CHECK_SECONDS", "2"))
+
+
+def load_lexicon_files(paths):
+    """Phrase and pattern categories merged from lexicon YAML files, plus each file's version"""
+    phrases, patterns, file_versions = {}, {}, []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            data = yaml.safe_load(f) or {}
+        file_versions.append(f"{os.path.basename(path)} v{data.get('version', 0)}")
+        for category, items in (data.get("phrases") or {}).items():
+            phrases.setdefault(category, []).extend(str(item) for item in items or [])
+        for category, items in (data.get("patterns") or {}).items():
+            patterns.setdefault(category, []).extend(str(item) for item in items or [])
+    return phrases, patterns, file_versions
+
+
+class FraudLexicon:
+    """One snapshot of the lexicon files and the matcher compiled from it
+
+    Never changed after it is built; a reload builds a new one and swaps it in.
+    """
+
+    def __init__(self, phrases, patterns, file_versions=()):
+        self.phrases = phrases
+        self.patterns = patterns
+        self.file_versions = list(file_versions)
+        self.matcher = LexiconMatcher(phrases, patterns)
+        self.version = hashlib.sha256(json.dumps([phrases, patterns], sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+    @classmethod
+    def from_files(cls, paths):
+        return cls(*load_lexicon_files(paths))
+
+    def is_phrase_category(self, category):
+        return category in self.phrases
+
+
+class ReloadingLexicon:
+    """The current FraudLexicon, rebuilt whenever one of its files changes on disk
+
+    Readers take whatever snapshot is current and never wait: one caller at a
+    time checks the file mtimes, and a changed lexicon is compiled on the side
+    before a single attribute assignment swaps it in. A file that fails to load
+    or compile is logged and the previous lexicon stays in use.
+    """
+
+    def __init__(self, paths=None, check_seconds=LEXICON_CHECK_SECONDS):
+        self.paths = list(paths or FRAUD_LEXICON_PATHS)
+        self.check_seconds = check_seconds
+        self.reloads = 0
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._mtimes = self._stat()
+        self._checked = time.monotonic()
+        self._current = FraudLexicon.from_files(self.paths)
+
+    def _stat(self):
+        mtimes = []
+        for path in self.paths:
+            try:
+                mtimes.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+        return tuple(mtimes)
+
+    def current(self):
+        """The latest lexicon, checking the files first if it is time to"""
+        now = time.monotonic()
+        if now - self._checked >= self.check_seconds and self._lock.acquire(blocking=False):
+            try:
+                self._checked = now
+                self._reload_if_changed()
+            finally:
+                self._lock.release()
+        return self._current
+
+    def _reload_if_changed(self):
+        mtimes = self._stat()
+        if mtimes == self._mtimes:
+            return
+        # Remember these mtimes even if loading fails, so a broken file is reported once, not on every check.
+        self._mtimes = mtimes
+        try:
+            lexicon = FraudLexicon.from_files(self.paths)
+        except (OSError, yaml.YAMLError, re.error, AttributeError, TypeError) as e:
+            self.last_error = str(e)
+            logging.warning(f"Fraud lexicon reload failed, keeping version {self._current.version}: {e}")
+            return
+        self._current = lexicon
+        self.last_error = None
+        self.reloads += 1
+        logging.info(f"Fraud lexicon reloaded: {', '.join(lexicon.file_versions)} ({lexicon.version})")
+
+    def stats(self):
+        lexicon = self._current
+        return {
+            "version": lexicon.version,
+            "files": lexicon.file_versions,
+            "reloads": self.reloads,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,100 @@
+import math
+import os
+
+import yaml
+
+# ---------------- Config ----------------
+FRAUD_MODEL_PATH = os.environ.get(
+    "PORTAL_FRAUD_MODEL_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "fraud_model.yaml"),
+)
+# The lexicon categories the model reads, in feature order.
+SCORED_CATEGORIES = ('suspicious_phrases', 'red_flags', 'urgency_indicators', 'financial_promises')
+# Documents shorter than this are scored as if they were this long, so a one-line
+# upload with a single "deadline" is not read as wall-to-wall urgency.
+MIN_SCORED_WORDS = 100
+
+
+# ---------------- Features ----------------
+def feature_names():
+    names = []
+    for category in SCORED_CATEGORIES:
+        names += [f"{category}_distinct", f"{category}_per_1k_words"]
+    return names
+
+
+def feature_vector(analysis_results):
+    """Length-normalised features of one analyze_text_patterns result
+
+    Each category contributes how many different terms were found and how
+    often its terms occur per thousand words, both on a log scale. Saying
+    "deadline" twelve times in a long contract barely moves either.
+    """
+    words = max(analysis_results.get('word_count') or 0, MIN_SCORED_WORDS)
+    occurrences = analysis_results.get('occurrences') or {}
+    vector = []
+    for category in SCORED_CATEGORIES:
+        found = analysis_results.get(category) or []
+        count = occurrences.get(category, len(found))
+        vector.append(math.log1p(len(set(found))))
+        vector.append(math.log1p(1000 * count / words))
+    return vector
+
+
+# ---------------- Model ----------------
+class FraudScoringModel:
+    """Logistic regression over scaled features, trained offline
+
+    The coefficients come from data/fraud_model.yaml, written by
+    python -m utils.train_fraud_model. None may be negative, so finding more
+    never lowers a score. Scoring a batch is one matrix product.
+    """
+
+    def __init__(self, features, means, scales, coefficients, intercept, version=None):
+        if list(features) != feature_names():
+            raise ValueError(f"Fraud model was trained on features {features}, expected {feature_names()}")
+        if any(coefficient < 0 for coefficient in coefficients):
+            raise ValueError("Fraud model has negative coefficients; retrain it with python -m utils.train_fraud_model")
+        self.features = list(features)
+        self.means = list(means)
+        self.scales = list(scales)
+        self.coefficients = list(coefficients)
+        self.intercept = float(intercept)
+        self.version = version
+
+    @classmethod
+    def load(cls, path=FRAUD_MODEL_PATH):
+        with open(path, encoding="utf-8") as f:
+            data = yaml.safe_load(f) or {}
+        return cls(
+            data["features"], data["means"], data["scales"], data["coefficients"], data["intercept"],
+            version=data.get("version"),
+        )
+
+    def to_dict(self):
+        return {
+            "version": self.version,
+            "features": self.features,
+            "means": self.means,
+            "scales": self.scales,
+            "coefficients": self.coefficients,
+            "intercept": self.intercept,
+        }
+
+    def probabilities(self, vectors):
+        """Probability of fraud for each row of a features matrix"""
+        import numpy as np
+
+        matrix = np.asarray(vectors, dtype=float).reshape(-1, len(self.features))
+        logits = ((matrix - np.asarray(self.means)) / np.asarray(self.scales)) @ np.asarray(self.coefficients)
+        return 1.0 / (1.0 + np.exp(-(logits + self.intercept)))
+
+    def score_batch(self, analysis_results):
+        """0-100 risk scores for many analyze_text_patterns results at once"""
+        if not analysis_results:
+            return []
+        probabilities = self.probabilities([feature_vector(results) for results in analysis_results])
+        return [int(round(100 * p)) for p in probabilities]
+
+    def score(self, analysis_results):
+        return self.score_batch([analysis_results])[0]
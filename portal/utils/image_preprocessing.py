@@ -0,0 +1,93 @@
+import os
+
+import numpy as np
+from PIL import Image, ImageEnhance, ImageFilter
+
+# ---------------- Config ----------------
+MAX_OCR_DIMENSION = 2000
+CONTRAST_FACTOR = 1.5
+SHARPNESS_FACTOR = 1.3
+# "pil" is the original PIL chain, "opencv" the single-buffer NumPy/OpenCV pipeline.
+DEFAULT_BACKEND = os.environ.get("PORTAL_PREPROCESSING_BACKEND", "pil")
+
+
+def _target_size(width, height):
+    if width <= MAX_OCR_DIMENSION and height <= MAX_OCR_DIMENSION:
+        return None
+    ratio = min(MAX_OCR_DIMENSION/width, MAX_OCR_DIMENSION/height)
+    return int(width * ratio), int(height * ratio)
+
+
+# ---------------- PIL Backend ----------------
+def preprocess_image_pil(image):
+    """Enhanced image preprocessing for better OCR results"""
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+
+    new_size = _target_size(*image.size)
+    if new_size:
+        image = image.resize(new_size, Image.Resampling.LANCZOS)
+
+    image = ImageEnhance.Contrast(image).enhance(CONTRAST_FACTOR)
+    image = ImageEnhance.Sharpness(image).enhance(SHARPNESS_FACTOR)
+    image = image.convert('L')
+    image = image.filter(ImageFilter.MedianFilter(size=3))
+
+    return image
+
+
+# ---------------- OpenCV Backend ----------------
+# PIL's sharpness filter blends the image with this smoothing kernel; folding
+# the blend into one kernel lets OpenCV apply it in a single pass.
+_SMOOTH_KERNEL = np.array([[1, 1, 1], [1, 5, 1], [1, 1, 1]], dtype=np.float32) / 13
+_IDENTITY_KERNEL = np.array([[0, 0, 0], [0, 1, 0], [0, 0, 0]], dtype=np.float32)
+
+
+def sharpen_kernel(factor=SHARPNESS_FACTOR):
+    """Single 3x3 kernel equivalent to ImageEnhance.Sharpness(factor)"""
+    return factor * _IDENTITY_KERNEL + (1 - factor) * _SMOOTH_KERNEL
+
+
+def preprocess_image_opencv(image, threshold=True):
+    """Same steps as the PIL chain, applied in place to one NumPy buffer
+
+    Contrast and sharpening run on the grayscale buffer rather than on RGB,
+    which is a third of the work and indistinguishable for OCR. Adaptive
+    thresholding is applied on top when enabled. Deskewing happens before
+    preprocessing, in utils/orientation.py, for every backend.
+    """
+    import cv2
+
+    buffer = np.array(image.convert('L'))
+
+    new_size = _target_size(buffer.shape[1], buffer.shape[0])
+    if new_size:
+        buffer = cv2.resize(buffer, new_size, interpolation=cv2.INTER_AREA)
+
+    mean = float(buffer.mean())
+    # addWeighted saturates to 0..255 like PIL's blend; convertScaleAbs would mirror dark ink to grey.
+    cv2.addWeighted(buffer, CONTRAST_FACTOR, buffer, 0, (1 - CONTRAST_FACTOR) * mean, dst=buffer)
+    cv2.filter2D(buffer, -1, sharpen_kernel(), dst=buffer)
+    cv2.medianBlur(buffer, 3, dst=buffer)
+
+    if threshold:
+        cv2.adaptiveThreshold(buffer, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                              cv2.THRESH_BINARY, 31, 15, dst=buffer)
+
+    return Image.fromarray(buffer)
+
+
+# ---------------- Backend Selection ----------------
+PREPROCESSING_BACKENDS = {
+    "pil": preprocess_image_pil,
+    "opencv": preprocess_image_opencv,
+}
+
+
+def preprocess_image(image, backend=None):
+    """Prepare an image for OCR with the chosen preprocessing backend"""
+    backend = backend or DEFAULT_BACKEND
+    if backend not in PREPROCESSING_BACKENDS:
+        raise ValueError(f"Unknown preprocessing backend '{backend}'. "
+                         f"Choose one of: {', '.join(PREPROCESSING_BACKENDS)}")
+    return PREPROCESSING_BACKENDS[backend](image)
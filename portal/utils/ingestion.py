@@ -0,0 +1,159 @@
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# ---------------- Config ----------------
+CHUNK_SIZE = 1024 * 1024
+# Uploads are spooled here instead of being copied around in memory.
+SPOOL_DIR = os.environ.get("PORTAL_SPOOL_DIR") or tempfile.gettempdir()
+# Upper bound on the working memory all in-flight extractions may reserve.
+MEMORY_BUDGET_BYTES = int(os.environ.get("PORTAL_MEMORY_BUDGET_MB", "512")) * 1024 * 1024
+MEMORY_WAIT_SECONDS = 60
+RSS_SAMPLE_SECONDS = 0.02
+RECENT_METRICS = 200
+
+
+# ---------------- Spooling ----------------
+def hash_upload(uploaded_file):
+    """SHA-256 of an upload, read in chunks so no second full copy is made"""
+    digest = hashlib.sha256()
+    uploaded_file.seek(0)
+    for chunk in iter(lambda: uploaded_file.read(CHUNK_SIZE), b""):
+        digest.update(chunk)
+    uploaded_file.seek(0)
+    return digest.hexdigest()
+
+
+def copy_upload(uploaded_file, path):
+    """Write an upload to disk chunk by chunk"""
+    uploaded_file.seek(0)
+    with open(path, "wb") as out:
+        shutil.copyfileobj(uploaded_file, out, CHUNK_SIZE)
+    uploaded_file.seek(0)
+
+
+class SpooledUpload:
+    """An upload written to a temporary file, removed again on close"""
+
+    def __init__(self, uploaded_file, spool_dir=SPOOL_DIR):
+        suffix = os.path.splitext(uploaded_file.name)[1]
+        fd, self.path = tempfile.mkstemp(suffix=suffix, dir=spool_dir)
+        os.close(fd)
+        copy_upload(uploaded_file, self.path)
+        self.name = uploaded_file.name
+        self.size = os.path.getsize(self.path)
+
+    def close(self):
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# ---------------- Memory Budget ----------------
+class MemoryBudgetExceeded(RuntimeError):
+    pass
+
+
+class MemoryBudget:
+    """Per-process cap on the estimated working memory of concurrent extractions"""
+
+    def __init__(self, max_bytes=MEMORY_BUDGET_BYTES):
+        self.max_bytes = max_bytes
+        self.reserved_bytes = 0
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def reserve(self, nbytes, timeout=MEMORY_WAIT_SECONDS):
+        """Block until nbytes fit in the budget, then hold them for the with-block"""
+        # A single request larger than the whole budget may still run alone.
+        nbytes = min(nbytes, self.max_bytes)
+        with self._condition:
+            fits = self._condition.wait_for(
+                lambda: self.reserved_bytes + nbytes <= self.max_bytes, timeout=timeout
+            )
+            if not fits:
+                raise MemoryBudgetExceeded(
+                    "The server is busy processing other documents, please try again shortly."
+                )
+            self.reserved_bytes += nbytes
+        try:
+            yield
+        finally:
+            with self._condition:
+                self.reserved_bytes -= nbytes
+                self._condition.notify_all()
+
+
+memory_budget = MemoryBudget()
+
+
+# ---------------- Peak RSS Metrics ----------------
+def current_rss_bytes():
+    """Resident set size of this process right now"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # No /proc: fall back to the lifetime peak, reported in bytes on macOS.
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+
+class RequestMetrics:
+    """Peak resident memory observed while one document was processed"""
+
+    def __init__(self, name):
+        self.name = name
+        self.start_rss_bytes = current_rss_bytes()
+        self.peak_rss_bytes = self.start_rss_bytes
+        self.seconds = 0.0
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "start_rss_mb": round(self.start_rss_bytes / 1024 / 1024, 1),
+            "peak_rss_mb": round(self.peak_rss_bytes / 1024 / 1024, 1),
+            "seconds": round(self.seconds, 3),
+        }
+
+
+recent_request_metrics = deque(maxlen=RECENT_METRICS)
+
+
+@contextmanager
+def track_peak_rss(name):
+    """Sample RSS in the background for the duration of the with-block"""
+    metrics = RequestMetrics(name)
+    stopped = threading.Event()
+
+    def sample():
+        while not stopped.wait(RSS_SAMPLE_SECONDS):
+            metrics.peak_rss_bytes = max(metrics.peak_rss_bytes, current_rss_bytes())
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    start = time.perf_counter()
+    sampler.start()
+    try:
+        yield metrics
+    finally:
+        stopped.set()
+        sampler.join()
+        metrics.peak_rss_bytes = max(metrics.peak_rss_bytes, current_rss_bytes())
+        metrics.seconds = time.perf_counter() - start
+        recent_request_metrics.append(metrics)
+        logging.info(f"Extraction metrics: {metrics.to_dict()}")
@@ -0,0 +1,130 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+# ---------------- Config ----------------
+JOB_WORKERS = int(os.environ.get("PORTAL_JOB_WORKERS", "2"))
+# Jobs waiting for a worker before new submissions are turned away.
+MAX_QUEUED_JOBS = int(os.environ.get("PORTAL_MAX_QUEUED_JOBS", "20"))
+# Finished jobs kept for pages to read back; the oldest are dropped first.
+MAX_STORED_JOBS = int(os.environ.get("PORTAL_MAX_STORED_JOBS", "100"))
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class JobQueueFull(RuntimeError):
+    pass
+
+
+class Job:
+    """One unit of background work, its progress and its result"""
+
+    def __init__(self, name, total_steps=None):
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.status = QUEUED
+        self.total_steps = total_steps
+        self.step_number = 0
+        self.step_label = None
+        self.step_timings = []
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED)
+
+    @property
+    def queue_seconds(self):
+        return (self.started_at or time.time()) - self.submitted_at
+
+    @contextmanager
+    def step(self, label):
+        """Mark the next step as running and record how long it took"""
+        self.step_number += 1
+        self.step_label = label
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.step_timings.append((label, time.perf_counter() - start))
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "status": self.status,
+            "step": self.step_number,
+            "total_steps": self.total_steps,
+            "queue_seconds": round(self.queue_seconds, 3),
+            "step_seconds": {label: round(seconds, 3) for label, seconds in self.step_timings},
+            "error": self.error,
+        }
+
+
+class JobQueue:
+    """A bounded pool of worker threads running jobs that pages poll by id"""
+
+    def __init__(self, max_workers=JOB_WORKERS, max_queued=MAX_QUEUED_JOBS, max_stored=MAX_STORED_JOBS):
+        self.max_queued = max_queued
+        self.max_stored = max_stored
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, name, fn, *args, total_steps=None, **kwargs):
+        """Run fn(job, *args, **kwargs) on a worker; its return value becomes job.result"""
+        job = Job(name, total_steps)
+        with self._lock:
+            queued = sum(1 for j in self._jobs.values() if j.status == QUEUED)
+            if queued >= self.max_queued:
+                raise JobQueueFull("We're busy helping a lot of people right now, please try again in a minute.")
+            self._jobs[job.id] = job
+            self._evict()
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return {status: sum(1 for job in jobs if job.status == status) for status in (QUEUED, RUNNING, DONE, FAILED)}
+
+    def _run(self, job, fn, args, kwargs):
+        job.started_at = time.time()
+        job.status = RUNNING
+        try:
+            job.result = fn(job, *args, **kwargs)
+            job.status = DONE
+        except Exception as e:
+            logging.exception(f"Job {job.name} {job.id} failed")
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished_at = time.time()
+            logging.info(f"Job finished: {job.to_dict()}")
+
+    def _evict(self):
+        """Drop the oldest finished jobs once more than max_stored are kept"""
+        excess = len(self._jobs) - self.max_stored
+        if excess <= 0:
+            return
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished][:excess]:
+            del self._jobs[job_id]
+
+
+job_queue = JobQueue()
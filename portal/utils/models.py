@@ -0,0 +1,204 @@
+import logging
+import os
+import threading
+import time
+
+from utils.ingestion import current_rss_bytes
+
+# ---------------- Config ----------------
+SUMMARIZATION_MODEL = os.environ.get("PORTAL_SUMMARIZATION_MODEL", "facebook/bart-large-cnn")
+# "torch" (float32), "int8" (dynamically quantised Linear layers) or "onnx" (ONNX Runtime).
+SUMMARIZATION_BACKEND = os.environ.get("PORTAL_SUMMARIZATION_BACKEND", "torch")
+# Directory of a locally exported model, e.g.
+#   optimum-cli export onnx --model facebook/bart-large-cnn models/bart-large-cnn-onnx
+ONNX_MODEL_DIR = os.environ.get("PORTAL_ONNX_MODEL_DIR", "models/bart-large-cnn-onnx")
+# Comma-separated model names to load in the background when the server starts. Off by
+# default: TextRank is the default summary tier, so most sessions never need BART.
+WARM_UP_MODELS = os.environ.get("PORTAL_WARM_UP_MODELS", "")
+# After a failed load, wait this long before trying again, doubling on each failure.
+LOAD_RETRY_SECONDS = float(os.environ.get("PORTAL_MODEL_RETRY_SECONDS", "60"))
+MAX_LOAD_RETRY_SECONDS = 3600
+
+
+class ModelUnavailable(RuntimeError):
+    pass
+
+
+# ---------------- Lazy Process-Wide Models ----------------
+class ModelHandle:
+    """Loads a model once per process, on first use, and remembers what it cost"""
+
+    def __init__(self, name, loader):
+        self.name = name
+        self.loader = loader
+        self.load_seconds = None
+        self.rss_increase_bytes = None
+        self.error = None
+        self.failures = 0
+        self._retry_at = 0.0
+        self._model = None
+        self._lock = threading.Lock()
+        self._warming = False
+
+    @property
+    def loaded(self):
+        return self._model is not None
+
+    @property
+    def retry_in_seconds(self):
+        return max(self._retry_at - time.monotonic(), 0.0)
+
+    def get(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    if self.retry_in_seconds:
+                        # Do not repeat a multi-GB download or an out-of-memory load on every request.
+                        raise ModelUnavailable(f"Model '{self.name}' failed to load ({self.error}); "
+                                               f"retrying in {self.retry_in_seconds:.0f}s")
+                    self._load()
+        return self._model
+
+    def _load(self):
+        rss_before = current_rss_bytes()
+        start = time.perf_counter()
+        try:
+            self._model = self.loader()
+        except Exception as e:
+            self.error = str(e)
+            self.failures += 1
+            self._retry_at = time.monotonic() + min(LOAD_RETRY_SECONDS * 2 ** (self.failures - 1), MAX_LOAD_RETRY_SECONDS)
+            raise
+        self.error = None
+        self.failures = 0
+        self.load_seconds = time.perf_counter() - start
+        self.rss_increase_bytes = max(current_rss_bytes() - rss_before, 0)
+        logging.info(f"Loaded model '{self.name}' in {self.load_seconds:.1f}s "
+                     f"(+{self.rss_increase_bytes / 1024 / 1024:.0f}MB resident)")
+
+    def warm_up_in_background(self):
+        """Start loading without blocking; ignored while loading or backing off after a failure"""
+        with self._lock:
+            if self._model is not None or self._warming or self.retry_in_seconds:
+                return
+            self._warming = True
+
+        def warm_up():
+            try:
+                self.get()
+            except Exception as e:
+                logging.warning(f"Could not warm up model '{self.name}': {e}")
+            finally:
+                self._warming = False
+
+        threading.Thread(target=warm_up, name=f"warm-up-{self.name}", daemon=True).start()
+
+    def stats(self):
+        return {
+            "model": self.name,
+            "loaded": self.loaded,
+            "load_seconds": round(self.load_seconds, 2) if self.load_seconds is not None else None,
+            "rss_increase_mb": round(self.rss_increase_bytes / 1024 / 1024, 1)
+            if self.rss_increase_bytes is not None else None,
+            "error": self.error,
+            "retry_in_seconds": round(self.retry_in_seconds) if self.error else None,
+        }
+
+
+# ---------------- Registry ----------------
+MODELS = {}
+
+
+def register_model(name, loader):
+    """Make a lazily loaded model available by name"""
+    MODELS[name] = ModelHandle(name, loader)
+    return MODELS[name]
+
+
+def get_model(name):
+    """The process-wide instance of a registered model, loading it if needed"""
+    return MODELS[name].get()
+
+
+_warm_up_started = False
+_warm_up_lock = threading.Lock()
+
+
+def warm_up_models(names=WARM_UP_MODELS):
+    """Load the named models in background threads, once per server process
+
+    Streamlit reruns app.py on every interaction, so later calls do nothing.
+    """
+    global _warm_up_started
+    with _warm_up_lock:
+        if _warm_up_started:
+            return
+        _warm_up_started = True
+    for name in filter(None, (n.strip() for n in names.split(","))):
+        if name in MODELS:
+            MODELS[name].warm_up_in_background()
+        else:
+            logging.warning(f"Cannot warm up unknown model '{name}'")
+
+
+def model_stats():
+    return [handle.stats() for handle in MODELS.values()]
+
+
+# ---------------- Summarization ----------------
+def _load_torch_pipeline():
+    from transformers import pipeline
+
+    return pipeline("summarization", model=SUMMARIZATION_MODEL, device=-1)
+
+
+def _load_int8_pipeline():
+    """float32 weights quantised to int8 at load time; activations stay float"""
+    import torch
+
+    summarizer = _load_torch_pipeline()
+    summarizer.model = torch.quantization.quantize_dynamic(
+        summarizer.model, {torch.nn.Linear}, dtype=torch.qint8
+    )
+    return summarizer
+
+
+def _load_onnx_pipeline():
+    try:
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    except ImportError:
+        raise ImportError("The onnx summarization backend needs 'optimum[onnxruntime]' installed")
+    from transformers import AutoTokenizer, pipeline
+
+    if not os.path.isdir(ONNX_MODEL_DIR):
+        raise FileNotFoundError(
+            f"No exported ONNX model in '{ONNX_MODEL_DIR}'. Export one with: "
+            f"optimum-cli export onnx --model {SUMMARIZATION_MODEL} {ONNX_MODEL_DIR}"
+        )
+    model = ORTModelForSeq2SeqLM.from_pretrained(ONNX_MODEL_DIR)
+    tokenizer = AutoTokenizer.from_pretrained(ONNX_MODEL_DIR)
+    return pipeline("summarization", model=model, tokenizer=tokenizer)
+
+
+SUMMARIZATION_BACKENDS = {
+    "torch": _load_torch_pipeline,
+    "int8": _load_int8_pipeline,
+    "onnx": _load_onnx_pipeline,
+}
+
+
+def load_summarization_pipeline(backend=None):
+    """Build a summarization pipeline on the given inference backend"""
+    backend = backend or SUMMARIZATION_BACKEND
+    if backend not in SUMMARIZATION_BACKENDS:
+        raise ValueError(
+            f"Unknown summarization backend '{backend}'. Choose one of: {', '.join(SUMMARIZATION_BACKENDS)}"
+        )
+    return SUMMARIZATION_BACKENDS[backend]()
+
+
+register_model("summarization", load_summarization_pipeline)
+
+
+def summarization_pipeline():
+    return get_model("summarization")
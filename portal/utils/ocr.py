@@ -0,0 +1,203 @@
+import io
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from PIL import Image
+
+from utils.ocr_backends import get_backend
+
+# ---------------- Config ----------------
+# Resolution used to rasterise scanned PDF pages before OCR.
+OCR_DPI = int(os.environ.get("PORTAL_OCR_DPI", "300"))
+# Pages with less extractable text than this are treated as scanned images.
+MIN_TEXT_LAYER_CHARS = 20
+# Straighten rotated or skewed photos before OCR.
+CORRECT_ORIENTATION = os.environ.get("PORTAL_CORRECT_ORIENTATION", "1") == "1"
+# OCR only the detected text blocks of photos instead of the whole frame.
+OCR_TEXT_REGIONS = os.environ.get("PORTAL_OCR_TEXT_REGIONS", "1") == "1"
+# Largest side we ever need an image decoded at (OCR downsizes to 2000px).
+IMAGE_DECODE_DIMENSION = 2000
+
+
+def available_cpus():
+    """Number of CPU cores this process is allowed to run on"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+# ---------------- Image OCR ----------------
+def open_image(path):
+    """Open an image file, letting JPEG decode straight at reduced size"""
+    image = Image.open(path)
+    if image.format == "JPEG":
+        image.draft("RGB", (IMAGE_DECODE_DIMENSION, IMAGE_DECODE_DIMENSION))
+    return image
+
+
+def count_frames(path):
+    """Number of frames (pages) in an image file; multi-page TIFFs have several"""
+    with Image.open(path) as image:
+        return getattr(image, "n_frames", 1)
+
+
+def extract_text_from_image(image, engine=None, preprocessing=None, correct_rotation=CORRECT_ORIENTATION,
+                            text_regions=OCR_TEXT_REGIONS, max_workers=None):
+    """Extract text from image with the chosen OCR engine"""
+    # The numpy/OpenCV stack is only loaded once something actually needs OCR.
+    from utils.image_preprocessing import preprocess_image
+    from utils.orientation import correct_orientation
+    from utils.text_regions import ocr_text_regions
+
+    backend = get_backend(engine)
+    report = None
+    if correct_rotation:
+        image, report = correct_orientation(image)
+
+    processed = preprocess_image(image, backend=preprocessing)
+    ocr_start = time.perf_counter()
+    text = None
+    if text_regions and backend.supports_regions:
+        # Bulk screening workers already run one document per core, so their regions go one at a time.
+        text = ocr_text_regions(processed, backend.block_to_text, max_workers or (1 if _inline else available_cpus()))
+    if text is None:
+        text = backend.image_to_text(processed)
+    ocr_seconds = time.perf_counter() - ocr_start
+
+    if report is not None:
+        share = report.seconds / (report.seconds + ocr_seconds) * 100
+        logging.info(f"Orientation {report.to_dict()} took {share:.1f}% of "
+                     f"{(report.seconds + ocr_seconds) * 1000:.0f}ms orientation + OCR time")
+    return text
+
+
+# ---------------- Worker Pool ----------------
+_pool = None
+_pool_lock = threading.Lock()
+# True in processes that are themselves pool workers (see init_inline_ocr_worker).
+_inline = False
+
+
+def init_ocr_worker():
+    """Pool initializer: pages are already OCRed in parallel, so each Tesseract run gets one thread
+
+    Set in the worker processes only; the server's own environment (and the
+    thread pools of torch in it) is left alone.
+    """
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+
+def get_ocr_pool():
+    """Process pool shared by all OCR requests, sized to the available cores"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=available_cpus(), initializer=init_ocr_worker)
+        return _pool
+
+
+def _reset_ocr_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+_thread_pool = None
+
+
+def init_inline_ocr_worker():
+    """Pool initializer for worker processes that extract whole documents themselves
+
+    A forked worker inherits the parent's OCR pools, whose manager threads do
+    not exist in the child, so futures submitted to them never complete.
+    Those are dropped, and OCR in this process then runs inline, one page and
+    one text region at a time, instead of every worker starting a pool (or a
+    thread per core) of its own.
+    """
+    global _pool, _thread_pool, _pool_lock, _inline
+    _pool = None
+    _thread_pool = None
+    _pool_lock = threading.Lock()
+    _inline = True
+    init_ocr_worker()
+
+
+def get_in_process_pool():
+    """Threads in this process for engines that share one loaded model (see OCRBackend.in_process)"""
+    global _thread_pool
+    with _pool_lock:
+        if _thread_pool is None:
+            _thread_pool = ThreadPoolExecutor(max_workers=available_cpus(), thread_name_prefix="ocr")
+        return _thread_pool
+
+
+def _submit(fn, *args, engine=None):
+    """Run an OCR worker function in the process pool, or on a thread for in-process engines"""
+    if _inline:
+        future = Future()
+        try:
+            future.set_result(fn(*args, engine))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+    if get_backend(engine).in_process:
+        return get_in_process_pool().submit(fn, *args, engine)
+    try:
+        return get_ocr_pool().submit(fn, *args, engine)
+    except BrokenProcessPool:
+        _reset_ocr_pool()
+        return get_ocr_pool().submit(fn, *args, engine)
+
+
+def ocr_image_frame(path, frame_index, engine=None):
+    """Worker entry point: OCR one frame of an image file
+
+    Frames of a batch already run in parallel (in the process pool, or on
+    threads for in-process engines), so regions within a frame are OCRed
+    one after another.
+    """
+    with open_image(path) as image:
+        image.seek(frame_index)
+        return extract_text_from_image(image.copy(), engine=engine, max_workers=1)
+
+
+def submit_image_frame(path, frame_index, engine=None):
+    """Queue one frame of an image file for OCR, returning a future"""
+    return _submit(ocr_image_frame, path, frame_index, engine=engine)
+
+
+# ---------------- Scanned PDF Pages ----------------
+def needs_ocr(page_text):
+    """True when a PDF page has no usable text layer"""
+    return len(page_text.strip()) < MIN_TEXT_LAYER_CHARS
+
+
+def rasterize_page(page, dpi=OCR_DPI):
+    """Render a PyMuPDF page to grayscale PNG bytes"""
+    import fitz  # PyMuPDF
+
+    pixmap = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+    return pixmap.tobytes("png")
+
+
+def ocr_png_page(png_bytes, engine=None):
+    """Worker entry point: OCR one rasterised page"""
+    from utils.orientation import correct_orientation
+
+    with Image.open(io.BytesIO(png_bytes)) as image:
+        if CORRECT_ORIENTATION:
+            image, _ = correct_orientation(image)
+        return get_backend(engine).image_to_text(image)
+
+
+def submit_pdf_page(pdf_document, index, dpi=OCR_DPI, engine=None):
+    """Rasterise one page of an open PDF and queue it for OCR, returning a future"""
+    png_bytes = rasterize_page(pdf_document[index], dpi)
+    return _submit(ocr_png_page, png_bytes, engine=engine)
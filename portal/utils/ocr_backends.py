@@ -0,0 +1,154 @@
+import logging
+import os
+import threading
+import time
+
+# ---------------- Config ----------------
+DEFAULT_OCR_ENGINE = os.environ.get("PORTAL_OCR_ENGINE", "tesseract")
+TESSERACT_LANGUAGE = "eng"
+EASYOCR_LANGUAGES = ["en"]
+
+
+# ---------------- Backend Interface ----------------
+class OCRBackend:
+    """An OCR engine that turns a PIL image into text"""
+
+    name = None
+    label = None
+    # Whether the engine benefits from being handed pre-cropped text blocks.
+    supports_regions = False
+    # Engines holding a large model run on threads in the server process, sharing one
+    # loaded copy, instead of in the OCR process pool where every worker would load its own.
+    in_process = False
+
+    def image_to_text(self, image):
+        raise NotImplementedError
+
+    def block_to_text(self, image):
+        """OCR an image known to contain a single block of text"""
+        return self.image_to_text(image)
+
+    def warm_up(self):
+        """Load anything expensive ahead of the first request"""
+
+
+# ---------------- Tesseract ----------------
+class TesseractBackend(OCRBackend):
+    name = "tesseract"
+    label = "Tesseract (fast)"
+    supports_regions = True
+
+    def image_to_text(self, image):
+        import pytesseract
+
+        return pytesseract.image_to_string(image, lang=TESSERACT_LANGUAGE).strip()
+
+    def block_to_text(self, image):
+        import pytesseract
+
+        return pytesseract.image_to_string(image, lang=TESSERACT_LANGUAGE, config="--psm 6").strip()
+
+
+# ---------------- EasyOCR ----------------
+class EasyOCRBackend(OCRBackend):
+    """EasyOCR with one Reader per process, shared by every request
+
+    Building a Reader loads detection and recognition models (seconds and
+    hundreds of MB), so it happens once. readtext calls are serialised on
+    the shared Reader.
+    """
+
+    name = "easyocr"
+    label = "EasyOCR (better on photos, slower)"
+    in_process = True
+
+    def __init__(self, languages=None):
+        self.languages = languages or EASYOCR_LANGUAGES
+        self._reader = None
+        self._lock = threading.Lock()
+
+    @property
+    def reader(self):
+        if self._reader is None:
+            with self._lock:
+                if self._reader is None:
+                    import easyocr
+
+                    start = time.perf_counter()
+                    self._reader = easyocr.Reader(self.languages, gpu=False, verbose=False)
+                    logging.info(f"EasyOCR reader loaded in {time.perf_counter() - start:.1f}s")
+        return self._reader
+
+    def image_to_text(self, image):
+        import numpy as np
+
+        reader = self.reader
+        with self._lock:
+            lines = reader.readtext(np.asarray(image), detail=0, paragraph=True)
+        return "\n".join(lines).strip()
+
+    def warm_up(self):
+        self.reader
+
+
+# ---------------- Registry ----------------
+OCR_BACKENDS = {}
+
+
+def register_backend(backend):
+    """Make an OCR engine selectable by name"""
+    OCR_BACKENDS[backend.name] = backend
+    return backend
+
+
+def get_backend(name=None):
+    """Look up a registered OCR engine, defaulting to PORTAL_OCR_ENGINE"""
+    name = name or DEFAULT_OCR_ENGINE
+    if name not in OCR_BACKENDS:
+        raise ValueError(f"Unknown OCR engine '{name}'. Choose one of: {', '.join(OCR_BACKENDS)}")
+    return OCR_BACKENDS[name]
+
+
+_warm_ups_started = set()
+_warm_up_lock = threading.Lock()
+
+
+def warm_up_in_background(name=None):
+    """Start loading an engine's models without blocking the page, once per process"""
+    backend = get_backend(name)
+    if type(backend).warm_up is OCRBackend.warm_up:
+        return
+    with _warm_up_lock:
+        # A failed warm-up is not retried here; the first real request loads (or reports) it.
+        if backend.name in _warm_ups_started:
+            return
+        _warm_ups_started.add(backend.name)
+
+    def warm_up():
+        try:
+            backend.warm_up()
+        except Exception as e:
+            logging.warning(f"Could not warm up OCR engine '{backend.name}': {e}")
+
+    threading.Thread(target=warm_up, name=f"warm-up-{backend.name}", daemon=True).start()
+
+
+def select_ocr_engine(label, key):
+    """Streamlit selectbox for the OCR engine; starts loading the choice in the background"""
+    import streamlit as st
+
+    names = list(OCR_BACKENDS)
+    engine = st.selectbox(
+        label,
+        names,
+        index=names.index(DEFAULT_OCR_ENGINE),
+        format_func=lambda name: OCR_BACKENDS[name].label,
+        key=key,
+        help="EasyOCR copes better with phone photos but takes longer"
+    )
+    warm_up_in_background(engine)
+    return engine
+
+
+register_backend(TesseractBackend())
+register_backend(EasyOCRBackend())
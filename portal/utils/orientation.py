@@ -0,0 +1,179 @@
+import logging
+import time
+
+import numpy as np
+from PIL import Image
+
+# ---------------- Config ----------------
+# Orientation and skew are estimated on a copy no larger than this.
+ANALYSIS_DIMENSION = 800
+MAX_SKEW_DEGREES = 15
+COARSE_STEP_DEGREES = 1.0
+FINE_STEP_DEGREES = 0.1
+# Rotations smaller than this are not worth resampling the image for.
+MIN_CORRECTION_DEGREES = 0.3
+
+
+class OrientationReport:
+    """What the orientation stage found and how long each part took"""
+
+    def __init__(self, rotation=0, skew=0.0, method="projection"):
+        self.rotation = rotation
+        self.skew = skew
+        self.method = method
+        self.estimate_seconds = 0.0
+        self.rotate_seconds = 0.0
+
+    @property
+    def seconds(self):
+        return self.estimate_seconds + self.rotate_seconds
+
+    def to_dict(self):
+        return {
+            "rotation": self.rotation,
+            "skew": round(self.skew, 2),
+            "method": self.method,
+            "estimate_ms": round(self.estimate_seconds * 1000, 1),
+            "rotate_ms": round(self.rotate_seconds * 1000, 1),
+        }
+
+
+# ---------------- Analysis Copy ----------------
+def analysis_copy(image):
+    """Downscaled, binarised (ink = 1) copy of an image for cheap estimation"""
+    import cv2
+
+    gray = image.convert('L')
+    gray.thumbnail((ANALYSIS_DIMENSION, ANALYSIS_DIMENSION), Image.Resampling.BILINEAR)
+    buffer = np.asarray(gray)
+    _, binary = cv2.threshold(buffer, 0, 1, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    return binary
+
+
+def _profile_score(ys, xs, angle):
+    """Text lines give sharp peaks in the row profile when the page is level
+
+    Only the ink pixel coordinates are rotated, which is far cheaper than
+    resampling the whole image for every candidate angle.
+    """
+    theta = np.deg2rad(angle)
+    rows = np.rint(ys * np.cos(theta) - xs * np.sin(theta)).astype(np.int64)
+    profile = np.bincount(rows - rows.min())
+    return float(np.square(np.diff(profile)).sum())
+
+
+# ---------------- Skew ----------------
+def estimate_skew(binary):
+    """Skew angle in degrees (counter-clockwise correction) by projection profile"""
+    ys, xs = np.nonzero(binary)
+    if len(ys) < 50:
+        return 0.0
+    ys = ys.astype(np.float64)
+    xs = xs.astype(np.float64)
+
+    coarse = np.arange(-MAX_SKEW_DEGREES, MAX_SKEW_DEGREES + COARSE_STEP_DEGREES, COARSE_STEP_DEGREES)
+    best = max(coarse, key=lambda angle: _profile_score(ys, xs, angle))
+
+    fine = np.arange(best - COARSE_STEP_DEGREES, best + COARSE_STEP_DEGREES + FINE_STEP_DEGREES, FINE_STEP_DEGREES)
+    return float(max(fine, key=lambda angle: _profile_score(ys, xs, angle)))
+
+
+# ---------------- Orientation ----------------
+def _tesseract_rotation(image):
+    """Page rotation from Tesseract's orientation detection, or None if unavailable"""
+    import pytesseract
+
+    try:
+        osd = pytesseract.image_to_osd(image, output_type=pytesseract.Output.DICT)
+    except Exception as e:
+        logging.debug(f"Tesseract orientation detection unavailable: {e}")
+        return None
+    # Tesseract reports the clockwise rotation needed; we work counter-clockwise.
+    return -int(osd.get("rotate", 0)) % 360
+
+
+def _projection_rotation(binary):
+    """0 or 90: text lines run along whichever axis has the sharper profile
+
+    Each axis is scored at its own best skew angle, so a photo taken a few
+    degrees off level is compared fairly rather than on its skewed rows.
+    Projection profiles cannot tell upright text from upside-down text, so
+    without Tesseract's orientation data only sideways pages are corrected.
+    """
+    ys, xs = np.nonzero(binary)
+    if len(ys) < 50:
+        return 0
+    ys = ys.astype(np.float64)
+    xs = xs.astype(np.float64)
+
+    angles = np.arange(-MAX_SKEW_DEGREES, MAX_SKEW_DEGREES + COARSE_STEP_DEGREES, COARSE_STEP_DEGREES)
+    upright = max(_profile_score(ys, xs, angle) for angle in angles)
+    # Swapping the coordinates scores the column profile, i.e. lines running top to bottom.
+    sideways = max(_profile_score(xs, ys, angle) for angle in angles)
+    return 90 if sideways > upright * 1.5 else 0
+
+
+def detect_orientation(image, binary):
+    """Counter-clockwise rotation (0, 90, 180, 270) that makes the text upright"""
+    small = Image.fromarray(((1 - binary) * 255).astype(np.uint8))
+    rotation = _tesseract_rotation(small)
+    if rotation is not None:
+        return rotation, "osd"
+    return _projection_rotation(binary), "projection"
+
+
+# ---------------- Correction ----------------
+_TRANSPOSE_FOR_ROTATION = {
+    90: Image.Transpose.ROTATE_90,
+    180: Image.Transpose.ROTATE_180,
+    270: Image.Transpose.ROTATE_270,
+}
+
+
+def rotate_by_skew(image, angle):
+    """Rotate counter-clockwise by a small angle, growing the canvas to fit"""
+    import cv2
+
+    buffer = np.asarray(image)
+    height, width = buffer.shape[:2]
+    matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+
+    cos, sin = abs(matrix[0, 0]), abs(matrix[0, 1])
+    new_width = int(height * sin + width * cos)
+    new_height = int(height * cos + width * sin)
+    matrix[0, 2] += new_width / 2 - width / 2
+    matrix[1, 2] += new_height / 2 - height / 2
+
+    fill = (255,) * (buffer.shape[2] if buffer.ndim == 3 else 1)
+    rotated = cv2.warpAffine(buffer, matrix, (new_width, new_height), flags=cv2.INTER_LINEAR,
+                             borderMode=cv2.BORDER_CONSTANT, borderValue=fill)
+    return Image.fromarray(rotated)
+
+
+def correct_orientation(image):
+    """Rotate an image once so its text is upright and level before OCR
+
+    Estimation runs on a small binarised copy; the full-size image is then
+    transposed for quarter turns and warped once for skew. The returned
+    OrientationReport times both parts so they can be compared with OCR.
+    """
+    start = time.perf_counter()
+
+    binary = analysis_copy(image)
+    rotation, method = detect_orientation(image, binary)
+    if rotation:
+        binary = np.ascontiguousarray(np.rot90(binary, k=rotation // 90))
+    report = OrientationReport(rotation, estimate_skew(binary), method)
+
+    estimated = time.perf_counter()
+    report.estimate_seconds = estimated - start
+
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    if rotation:
+        image = image.transpose(_TRANSPOSE_FOR_ROTATION[rotation])
+    if abs(report.skew) >= MIN_CORRECTION_DEGREES:
+        image = rotate_by_skew(image, report.skew)
+
+    report.rotate_seconds = time.perf_counter() - estimated
+    return image, report
@@ -0,0 +1,152 @@
+import re
+
+# Phrase words may be separated by any run of whitespace in the document, including line breaks.
+_WORD_GAP = object()
+# Endings a lexicon phrase's last word may carry: "fee" also finds "fees", "return" "returns".
+INFLECTION = r"(?:s|es|d|ed|ing)?"
+
+
+class PhraseMatcher:
+    """Finds many phrases in one left-to-right pass over a text
+
+    The phrases are merged into a trie and the trie is written out as a single
+    regular expression, so alternatives that share a prefix are tried once
+    rather than phrase by phrase. Matching is case-insensitive, respects word
+    boundaries and prefers the longest phrase at each position. The cost is
+    linear in the length of the text and grows with the depth of the trie,
+    not the number of phrases.
+    """
+
+    def __init__(self, phrases):
+        self.phrases = {}
+        for phrase in phrases:
+            key = self.normalise(phrase)
+            if key:
+                self.phrases[key] = phrase
+        self.pattern = self._compile(self.phrases)
+
+    def __len__(self):
+        return len(self.phrases)
+
+    @staticmethod
+    def normalise(phrase):
+        """Key a phrase or a matched span: lower case, single spaces"""
+        return " ".join(phrase.lower().split())
+
+    def finditer(self, text):
+        """Yield (start, end, key) for every non-overlapping phrase in text"""
+        if self.pattern is None:
+            return
+        for match in self.pattern.finditer(text):
+            yield match.start(), match.end(), self.normalise(match.group())
+
+    def sub(self, replace, text):
+        """Replace every phrase with replace(matched_text, key)"""
+        if self.pattern is None:
+            return text
+        return self.pattern.sub(lambda match: replace(match.group(), self.normalise(match.group())), text)
+
+    # ---------------- Trie to Regex ----------------
+    @classmethod
+    def _compile(cls, phrases):
+        if not phrases:
+            return None
+        return re.compile(rf"(?<!\w)(?:{cls.phrase_pattern(phrases)})(?!\w)", re.IGNORECASE)
+
+    @classmethod
+    def phrase_pattern(cls, phrases):
+        """Regex source matching any of the normalised phrases, without word boundaries"""
+        trie = {}
+        for key in phrases:
+            node = trie
+            for word_index, word in enumerate(key.split(" ")):
+                if word_index:
+                    node = node.setdefault(_WORD_GAP, {})
+                for char in word:
+                    node = node.setdefault(char, {})
+            node[""] = {}
+        return cls._node_pattern(trie)
+
+    @classmethod
+    def _node_pattern(cls, node):
+        ends_here = "" in node
+        branches = []
+        for edge in sorted((edge for edge in node if edge != ""), key=lambda edge: edge is _WORD_GAP):
+            prefix = r"\s+" if edge is _WORD_GAP else re.escape(edge)
+            branches.append(prefix + cls._node_pattern(node[edge]))
+
+        if not branches:
+            return ""
+        if len(branches) == 1 and not ends_here:
+            return branches[0]
+        # Greedy alternatives, optional when a phrase can also end here, so longer phrases win.
+        return "(?:" + "|".join(branches) + ")" + ("?" if ends_here else "")
+
+
+class LexiconMatch:
+    """One hit of a LexiconMatcher: its category, position and normalised text"""
+
+    def __init__(self, category, start, end, key, page=None):
+        self.category = category
+        self.start = start
+        self.end = end
+        self.key = key
+        self.page = page
+
+    def to_dict(self):
+        return {"category": self.category, "start": self.start, "end": self.end, "text": self.key, "page": self.page}
+
+
+class LexiconMatcher:
+    """Several categories of phrases and regexes, each compiled into one pattern
+
+    Every category is scanned in its own pass and the hits are merged in text
+    order, so categories may overlap: "URGENT ACTION REQUIRED" is both a
+    suspicious phrase and an urgency word. Phrase categories are compiled as
+    tries (see PhraseMatcher), which keeps each pass linear in the text however
+    large the lexicon grows, and accept a plural or inflected last word
+    ("advance fees", "guaranteed returns"), reported as the lexicon phrase.
+    """
+
+    def __init__(self, phrases=None, patterns=None):
+        phrases = phrases or {}
+        patterns = patterns or {}
+        self.phrases = {
+            category: {PhraseMatcher.normalise(p) for p in category_phrases if PhraseMatcher.normalise(p)}
+            for category, category_phrases in phrases.items()
+        }
+
+        self.patterns = {}
+        for category in list(dict.fromkeys(list(phrases) + list(patterns))):
+            alternatives = []
+            if self.phrases.get(category):
+                alternatives.append(
+                    rf"(?<!\w)(?P<phrase>{PhraseMatcher.phrase_pattern(self.phrases[category])}){INFLECTION}(?!\w)"
+                )
+            alternatives += [f"(?:{pattern})" for pattern in patterns.get(category, [])]
+            if alternatives:
+                self.patterns[category] = re.compile("|".join(alternatives), re.IGNORECASE)
+
+    def finditer(self, text):
+        """Yield a LexiconMatch for every hit of every category, in text order
+
+        Hits of one category never overlap each other; hits of different
+        categories may.
+        """
+        matches = []
+        for category, pattern in self.patterns.items():
+            for match in pattern.finditer(text):
+                phrase = match.groupdict().get("phrase")
+                key = PhraseMatcher.normalise(phrase if phrase is not None else match.group())
+                matches.append(LexiconMatch(category, match.start(), match.end(), key))
+        matches.sort(key=lambda match: (match.start, -match.end))
+        yield from matches
+
+
+def match_case(matched, replacement):
+    """Give a replacement the capitalisation of the text it replaces"""
+    if matched.isupper() and len(matched) > 1:
+        return replacement.upper()
+    if matched[:1].isupper():
+        return replacement[:1].upper() + replacement[1:]
+    return replacement
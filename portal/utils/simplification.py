@@ -0,0 +1,42 @@
+import hashlib
+import json
+import os
+
+import yaml
+
+from utils.phrase_matcher import PhraseMatcher, match_case
+
+# ---------------- Config ----------------
+GLOSSARY_PATH = os.environ.get(
+    "PORTAL_GLOSSARY_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "legal_glossary.yaml"),
+)
+
+
+def load_glossary(path=GLOSSARY_PATH):
+    """Legal term -> plain-language replacement, keyed by normalised term"""
+    with open(path, encoding="utf-8") as f:
+        data = yaml.safe_load(f) or {}
+    return {PhraseMatcher.normalise(term): str(plain) for term, plain in (data.get("terms") or {}).items()}
+
+
+class JargonSimplifier:
+    """Rewrites every glossary term in one pass over the text"""
+
+    def __init__(self, glossary):
+        self.glossary = glossary
+        self.matcher = PhraseMatcher(glossary)
+        # Changes whenever the glossary does, so cached simplifications go stale with it.
+        self.version = hashlib.sha256(json.dumps(glossary, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+    def simplify(self, text):
+        # Replacements are never rescanned, so "default" inside a replacement stays as written.
+        return self.matcher.sub(lambda matched, key: match_case(matched, self.glossary[key]), text)
+
+
+jargon_simplifier = JargonSimplifier(load_glossary())
+
+
+def simplify_legal_text(text):
+    """Convert legal jargon to plain language"""
+    return jargon_simplifier.simplify(text)
@@ -0,0 +1,277 @@
+import logging
+import math
+import os
+import re
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.document_index import as_index
+
+# ---------------- Config ----------------
+# Tokens per chunk, kept under the model's context (1024 for BART) to leave room for special tokens.
+CHUNK_TOKENS = int(os.environ.get("PORTAL_SUMMARY_CHUNK_TOKENS", "900"))
+# Chunks summarised in one forward pass.
+SUMMARY_BATCH_SIZE = int(os.environ.get("PORTAL_SUMMARY_BATCH_SIZE", "4"))
+# Batches run at the same time; each one already uses several cores through torch.
+SUMMARY_CONCURRENCY = int(os.environ.get("PORTAL_SUMMARY_CONCURRENCY", "1"))
+# Upper bound on the document tokens fed to the model, which bounds latency on very long documents.
+MAX_SUMMARY_TOKENS = int(os.environ.get("PORTAL_SUMMARY_MAX_TOKENS", "16000"))
+CHUNK_SUMMARY_MAX_LENGTH = 120
+CHUNK_SUMMARY_MIN_LENGTH = 30
+SUMMARY_MAX_LENGTH = 200
+SUMMARY_MIN_LENGTH = 80
+MAX_REDUCE_ROUNDS = 4
+# Rough tokens per word for models without a tokenizer.
+TOKENS_PER_WORD = 1.3
+EXTRACTIVE_SENTENCES = 5
+PAGERANK_DAMPING = 0.85
+PAGERANK_TOLERANCE = 1e-6
+PAGERANK_MAX_ITERATIONS = 100
+# Sentences with fewer words than this are headings, numbering or signature lines.
+MIN_SENTENCE_WORDS = 4
+# Sentences repeated this often are page headers, footers or other boilerplate.
+BOILERPLATE_REPEATS = 3
+# Bump whenever the extractive summary changes so cached ones are not reused.
+TEXTRANK_VERSION = 2
+# Each sentence keeps only its strongest links, so the graph stays sparse on long documents.
+SIMILARITY_NEIGHBOURS = 20
+SIMILARITY_BLOCK_ROWS = 256
+
+
+# ---------------- Chunking ----------------
+def split_sentences(document):
+    """Sentences and clauses of a document, the units a chunk is built from"""
+    return [clause.text for clause in as_index(document).clauses]
+
+
+def count_tokens(sentences, tokenizer=None):
+    """Token count of each sentence, with the model's tokenizer in one batched call"""
+    if tokenizer is None:
+        return [math.ceil(len(s.split()) * TOKENS_PER_WORD) for s in sentences]
+    return [len(ids) for ids in tokenizer(sentences, add_special_tokens=False)["input_ids"]]
+
+
+def _split_long_sentence(sentence, tokens, max_tokens):
+    """Cut a sentence longer than a whole chunk into word runs that fit"""
+    words = sentence.split()
+    parts = math.ceil(tokens / max_tokens)
+    size = math.ceil(len(words) / parts)
+    return [(" ".join(words[i:i + size]), math.ceil(tokens / parts)) for i in range(0, len(words), size)]
+
+
+def chunk_text(document, tokenizer=None, max_tokens=CHUNK_TOKENS):
+    """Pack whole sentences into chunks of at most max_tokens
+
+    Returns (chunk_text, token_count) pairs in document order.
+    """
+    sentences = split_sentences(document)
+    if not sentences:
+        return []
+
+    units = []
+    for sentence, tokens in zip(sentences, count_tokens(sentences, tokenizer)):
+        if tokens > max_tokens:
+            units.extend(_split_long_sentence(sentence, tokens, max_tokens))
+        else:
+            units.append((sentence, tokens))
+
+    chunks = []
+    current, current_tokens = [], 0
+    for sentence, tokens in units:
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append((" ".join(current), current_tokens))
+            current, current_tokens = [], 0
+        current.append(sentence)
+        current_tokens += tokens
+    if current:
+        chunks.append((" ".join(current), current_tokens))
+    return chunks
+
+
+def limit_chunks(chunks, max_total_tokens=MAX_SUMMARY_TOKENS):
+    """Keep chunks spread evenly over the document so their tokens fit the cap
+
+    Dropping evenly spaced chunks, rather than the tail, keeps every part of
+    a long document represented in the summary.
+    """
+    total = sum(tokens for _, tokens in chunks)
+    if total <= max_total_tokens:
+        return chunks
+
+    keep = max(1, int(len(chunks) * max_total_tokens / total))
+    step = len(chunks) / keep
+    logging.info(f"Summarising {keep} of {len(chunks)} chunks to stay within {max_total_tokens} tokens")
+    return [chunks[int(i * step)] for i in range(keep)]
+
+
+# ---------------- Map-Reduce ----------------
+def _generation_lengths(tokens, max_length, min_length):
+    """Keep requested summary lengths sensible for short inputs"""
+    max_length = min(max_length, max(tokens, 16))
+    return max_length, min(min_length, max_length // 2)
+
+
+def summarize_batch(pipe, chunks, max_length, min_length):
+    """Summarise a batch of chunks in one forward pass"""
+    longest = max(tokens for _, tokens in chunks)
+    max_length, min_length = _generation_lengths(longest, max_length, min_length)
+    results = pipe(
+        [chunk for chunk, _ in chunks],
+        max_length=max_length,
+        min_length=min_length,
+        do_sample=False,
+        truncation=True,
+        batch_size=len(chunks),
+    )
+    return [result["summary_text"].strip() for result in results]
+
+
+def summarize_chunks(pipe, chunks, batch_size=SUMMARY_BATCH_SIZE, concurrency=SUMMARY_CONCURRENCY,
+                     max_length=CHUNK_SUMMARY_MAX_LENGTH, min_length=CHUNK_SUMMARY_MIN_LENGTH):
+    """Summarise chunks batch by batch, returning summaries in document order"""
+    batches = [chunks[i:i + batch_size] for i in range(0, len(chunks), batch_size)]
+
+    def run(batch):
+        return summarize_batch(pipe, batch, max_length, min_length)
+
+    if concurrency > 1 and len(batches) > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(run, batches))
+    else:
+        results = [run(batch) for batch in batches]
+    return [summary for batch in results for summary in batch]
+
+
+def map_reduce_summarize(document, pipe, batch_size=SUMMARY_BATCH_SIZE, concurrency=SUMMARY_CONCURRENCY,
+                         chunk_tokens=CHUNK_TOKENS, max_total_tokens=MAX_SUMMARY_TOKENS,
+                         max_length=SUMMARY_MAX_LENGTH, min_length=SUMMARY_MIN_LENGTH):
+    """Summarise a document of any length with a summarization pipeline
+
+    The document is split into sentence-aligned chunks that fit the model,
+    chunks are summarised in batches (map), and the joined summaries are
+    summarised again until they fit in one chunk (reduce).
+    """
+    tokenizer = getattr(pipe, "tokenizer", None)
+    start = time.perf_counter()
+
+    chunks = limit_chunks(chunk_text(document, tokenizer, chunk_tokens), max_total_tokens)
+    if not chunks:
+        return as_index(document).text
+    first_round_chunks = len(chunks)
+
+    rounds = 0
+    while len(chunks) > 1 and rounds < MAX_REDUCE_ROUNDS:
+        summaries = summarize_chunks(pipe, chunks, batch_size, concurrency)
+        chunks = chunk_text("\n\n".join(summaries), tokenizer, chunk_tokens)
+        rounds += 1
+
+    summary = summarize_batch(pipe, chunks[:1], max_length, min_length)[0]
+    logging.info(f"Summarised {first_round_chunks} chunks in {rounds} map-reduce rounds "
+                 f"in {time.perf_counter() - start:.1f}s")
+    return summary
+
+
+# ---------------- Extractive (TextRank) ----------------
+def pagerank(similarity, damping=PAGERANK_DAMPING, tolerance=PAGERANK_TOLERANCE,
+             max_iterations=PAGERANK_MAX_ITERATIONS):
+    """PageRank scores of a weighted, undirected sparse graph by power iteration"""
+    import numpy as np
+    from scipy import sparse
+
+    n = similarity.shape[0]
+    out_weight = np.asarray(similarity.sum(axis=1)).ravel()
+    dangling = out_weight == 0
+    out_weight[dangling] = 1.0
+    # Column-stochastic transition matrix; the graph is symmetric, so no transpose is needed.
+    transition = similarity @ sparse.diags(1.0 / out_weight)
+
+    scores = np.full(n, 1.0 / n)
+    for _ in range(max_iterations):
+        spread = scores[dangling].sum() / n
+        updated = (1 - damping) / n + damping * (transition @ scores + spread)
+        if np.abs(updated - scores).sum() < tolerance:
+            return updated
+        scores = updated
+    return scores
+
+
+def similarity_graph(vectors, neighbours=SIMILARITY_NEIGHBOURS, block_rows=SIMILARITY_BLOCK_ROWS):
+    """Sparse cosine-similarity graph linking each sentence to its nearest neighbours
+
+    Similarities are computed a block of rows at a time, so memory stays
+    proportional to sentences x neighbours instead of sentences squared.
+    """
+    import numpy as np
+    from scipy import sparse
+
+    n = vectors.shape[0]
+    k = min(neighbours, n - 1)
+    rows, cols, weights = [], [], []
+    for start in range(0, n, block_rows):
+        # Rows are L2-normalised, so the product is the cosine similarity.
+        block = (vectors[start:start + block_rows] @ vectors.T).toarray()
+        block[np.arange(len(block)), np.arange(start, start + len(block))] = 0
+        nearest = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        rows.append(np.repeat(np.arange(start, start + len(block)), k))
+        cols.append(nearest.ravel())
+        weights.append(np.take_along_axis(block, nearest, axis=1).ravel())
+
+    graph = sparse.csr_matrix(
+        (np.concatenate(weights), (np.concatenate(rows), np.concatenate(cols))), shape=(n, n)
+    )
+    graph.eliminate_zeros()
+    # Keep a link if either sentence chose it, so the graph stays undirected.
+    return graph.maximum(graph.T)
+
+
+def sentence_key(sentence):
+    """A sentence ignoring case, spacing, punctuation and numbers, so page numbers do not tell headers apart"""
+    return " ".join(re.sub(r"[\W\d_]+", " ", sentence.lower()).split())
+
+
+def distinct_sentences(sentences, boilerplate_repeats=BOILERPLATE_REPEATS):
+    """First occurrence of each sentence, without those repeated as page furniture
+
+    A sentence seen boilerplate_repeats times or more (a running header, a
+    footer, a disclaimer on every page) is dropped altogether, unless the
+    document has nothing else to offer.
+    """
+    keys = [sentence_key(sentence) for sentence in sentences]
+    counts = Counter(keys)
+    distinct = {}
+    for key, sentence in zip(keys, sentences):
+        distinct.setdefault(key, sentence)
+    content = [sentence for key, sentence in distinct.items() if counts[key] < boilerplate_repeats]
+    return content or list(distinct.values())
+
+
+def textrank_summarize(document, max_sentences=EXTRACTIVE_SENTENCES):
+    """Pick the most central sentences of a document, in their original order
+
+    Sentences become TF-IDF vectors; cosine similarity between them is the
+    weight of a sparse graph, and PageRank on that graph ranks sentences by
+    how much of the rest of the document they summarise. Repeated sentences
+    are ranked once and page headers and footers not at all (see
+    distinct_sentences), so they cannot crowd out the content.
+    """
+    import numpy as np
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    index = as_index(document)
+    sentences = distinct_sentences([
+        clause.text for clause in index.clauses
+        if sum(word.isalpha() for word in clause.text.split()) >= MIN_SENTENCE_WORDS
+    ])
+    if len(sentences) <= max_sentences:
+        return " ".join(sentences) or index.text
+
+    try:
+        vectors = TfidfVectorizer(stop_words="english", sublinear_tf=True, dtype=np.float32).fit_transform(sentences)
+    except ValueError:
+        # Nothing but stop words: keep the opening sentences.
+        return " ".join(sentences[:max_sentences])
+
+    scores = pagerank(similarity_graph(vectors))
+    top = np.argsort(-scores, kind="stable")[:max_sentences]
+    return " ".join(sentences[i] for i in sorted(top))
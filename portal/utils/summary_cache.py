@@ -0,0 +1,150 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+# ---------------- Config ----------------
+# Summaries are of users' private documents, so they are kept in a per-user app data
+# directory readable only by the server's account, never in the shared temp directory.
+SUMMARY_CACHE_PATH = os.environ.get(
+    "PORTAL_SUMMARY_CACHE_PATH",
+    os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "legal-portal", "summaries.sqlite3"),
+)
+SUMMARY_CACHE_TTL_SECONDS = float(os.environ.get("PORTAL_SUMMARY_CACHE_TTL_HOURS", "168")) * 3600
+SUMMARY_CACHE_MAX_BYTES = int(os.environ.get("PORTAL_SUMMARY_CACHE_MB", "32")) * 1024 * 1024
+
+
+def summary_key(text, model, params):
+    """Cache key for one result: the text's SHA-256, the model that produced it and its settings"""
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    settings = json.dumps(params, sort_keys=True)
+    return hashlib.sha256(f"{digest}|{model}|{settings}".encode("utf-8")).hexdigest()
+
+
+# ---------------- SQLite Store ----------------
+class SummaryCache:
+    """Summaries and simplified texts shared across sessions and restarts
+
+    Entries expire after ttl_seconds; once the store holds more than
+    max_bytes of text the least recently used entries are dropped.
+    """
+
+    def __init__(self, path=SUMMARY_CACHE_PATH, ttl_seconds=SUMMARY_CACHE_TTL_SECONDS,
+                 max_bytes=SUMMARY_CACHE_MAX_BYTES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._connection = None
+
+    def _connect(self):
+        if self._connection is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+            # Create the file owner-only before SQLite opens it; its journal inherits the same mode.
+            os.close(os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600))
+            os.chmod(self.path, 0o600)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.executescript("""
+                CREATE TABLE IF NOT EXISTS summaries (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    accessed REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS summaries_accessed ON summaries (accessed);
+            """)
+        return self._connection
+
+    def get(self, key):
+        now = time.time()
+        try:
+            with self._lock:
+                connection = self._connect()
+                row = connection.execute(
+                    "SELECT value FROM summaries WHERE key = ? AND created > ?", (key, now - self.ttl_seconds)
+                ).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                connection.execute("UPDATE summaries SET accessed = ? WHERE key = ?", (now, key))
+                connection.commit()
+                self.hits += 1
+                return row[0]
+        except (sqlite3.Error, OSError) as e:
+            logging.warning(f"Summary cache unavailable: {e}")
+            return None
+
+    def put(self, key, value):
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        try:
+            with self._lock:
+                connection = self._connect()
+                connection.execute(
+                    "INSERT OR REPLACE INTO summaries (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                    (key, value, size, now, now),
+                )
+                self._evict(connection, now)
+                connection.commit()
+        except (sqlite3.Error, OSError) as e:
+            logging.warning(f"Could not store summary in cache: {e}")
+
+    def get_or_compute(self, key, compute):
+        """Cached value for key, or compute() stored under it; failures are not cached"""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def _evict(self, connection, now):
+        expired = connection.execute(
+            "DELETE FROM summaries WHERE created <= ?", (now - self.ttl_seconds,)
+        ).rowcount
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM summaries").fetchone()[0]
+        evicted = 0
+        if total > self.max_bytes:
+            # Walk from least recently used, summing sizes until enough is freed.
+            freed = 0
+            stale = []
+            for key, size in connection.execute("SELECT key, size FROM summaries ORDER BY accessed"):
+                stale.append((key,))
+                freed += size
+                if total - freed <= self.max_bytes:
+                    break
+            connection.executemany("DELETE FROM summaries WHERE key = ?", stale)
+            evicted = len(stale)
+        self.evictions += expired + evicted
+
+    def stats(self):
+        try:
+            with self._lock:
+                entries, total = self._connect().execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM summaries"
+                ).fetchone()
+        except (sqlite3.Error, OSError):
+            entries, total = None, None
+        return {
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._connect().execute("DELETE FROM summaries")
+            self._connection.commit()
+
+
+summary_cache = SummaryCache()
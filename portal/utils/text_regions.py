@@ -0,0 +1,120 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# ---------------- Config ----------------
+# Regions smaller than this share of the page are specks, not text.
+MIN_REGION_AREA_RATIO = 0.0005
+REGION_PADDING = 12
+# If the text blocks cover most of the page, cropping saves nothing.
+MAX_USEFUL_COVERAGE = 0.85
+
+
+class TextRegion:
+    """A block of text on a page and how long it took to OCR"""
+
+    def __init__(self, left, top, width, height):
+        self.left = left
+        self.top = top
+        self.width = width
+        self.height = height
+        self.text = ""
+        self.seconds = 0.0
+
+    @property
+    def box(self):
+        return self.left, self.top, self.left + self.width, self.top + self.height
+
+    @property
+    def pixels(self):
+        return self.width * self.height
+
+    def to_dict(self):
+        return {
+            "box": self.box,
+            "pixels": self.pixels,
+            "ms": round(self.seconds * 1000, 1),
+            "chars": len(self.text),
+        }
+
+
+# ---------------- Detection ----------------
+def detect_text_regions(gray):
+    """Find text blocks on a grayscale page, returned in reading order
+
+    Ink is found with Otsu thresholding, then dilated with a wide, short
+    kernel so letters merge into lines and lines into paragraphs. Each
+    connected component becomes one region.
+    """
+    import cv2
+
+    height, width = gray.shape
+    _, ink = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (max(width // 40, 3), max(height // 80, 3)))
+    cv2.dilate(ink, kernel, dst=ink)
+
+    count, _, stats, _ = cv2.connectedComponentsWithStats(ink, connectivity=8)
+    min_area = MIN_REGION_AREA_RATIO * width * height
+
+    regions = []
+    for x, y, w, h, area in stats[1:count]:
+        if area < min_area:
+            continue
+        left = max(int(x) - REGION_PADDING, 0)
+        top = max(int(y) - REGION_PADDING, 0)
+        right = min(int(x + w) + REGION_PADDING, width)
+        bottom = min(int(y + h) + REGION_PADDING, height)
+        regions.append(TextRegion(left, top, right - left, bottom - top))
+
+    return sort_reading_order(regions)
+
+
+def sort_reading_order(regions):
+    """Top-to-bottom, and left-to-right for blocks that share a band of the page"""
+    ordered = []
+    for region in sorted(regions, key=lambda r: r.top):
+        # Start a new band unless this block overlaps the current band vertically.
+        if ordered and region.top < max(r.top + r.height for r in ordered[-1]) - region.height / 2:
+            ordered[-1].append(region)
+        else:
+            ordered.append([region])
+    return [region for band in ordered for region in sorted(band, key=lambda r: r.left)]
+
+
+# ---------------- OCR ----------------
+def ocr_text_regions(image, ocr_region, max_workers):
+    """OCR a preprocessed page region by region, in parallel
+
+    ocr_region is called with each cropped PIL image from a thread pool;
+    Tesseract runs as a subprocess, so threads are enough to use every core.
+    Returns the page text with regions in reading order, or None when region
+    detection would not save work and the whole page should be OCRed instead.
+    """
+    gray = np.asarray(image.convert('L'))
+    page_pixels = gray.shape[0] * gray.shape[1]
+
+    start = time.perf_counter()
+    regions = detect_text_regions(gray)
+    detect_seconds = time.perf_counter() - start
+
+    covered = sum(region.pixels for region in regions)
+    if not regions or covered > MAX_USEFUL_COVERAGE * page_pixels:
+        return None
+
+    def run(region):
+        region_start = time.perf_counter()
+        region.text = ocr_region(image.crop(region.box))
+        region.seconds = time.perf_counter() - region_start
+        return region
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        regions = list(pool.map(run, regions))
+
+    logging.info(
+        f"Region OCR: {len(regions)} regions, {covered / page_pixels:.0%} of page pixels, "
+        f"detection {detect_seconds * 1000:.0f}ms, regions {[region.to_dict() for region in regions]}"
+    )
+    return "\n".join(region.text for region in regions if region.text)
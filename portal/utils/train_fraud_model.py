@@ -0,0 +1,144 @@
+"""Train the fraud scoring model and write its coefficients for the app to load.
+
+The corpus is the generated documents in test_data.py, the hand-labelled
+documents in data/fraud_corpus and any further folders given with
+--labelled. Each folder holds fraud/*.txt (labelled 1), legitimate/*.txt
+(labelled 0) and borderline/*.txt (labelled 0.5: legitimate, but worth a
+manual review). Run from the portal directory:
+
+    python -m utils.train_fraud_model
+    python -m utils.train_fraud_model --labelled ~/reviewed-cases -C 0.5
+"""
+import argparse
+import datetime
+import glob
+import os
+
+import yaml
+
+from modules.fraud_checker import FraudDetector
+from utils.fraud_scoring import FRAUD_MODEL_PATH, FraudScoringModel, feature_names, feature_vector
+
+LABEL_FOLDERS = {"fraud": 1, "legitimate": 0, "borderline": 0.5}
+LABELLED_CORPUS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "fraud_corpus")
+
+
+def generated_corpus():
+    """(name, text, label) for every document test_data.py generates"""
+    from test_data import TestDataGenerator
+
+    generator = TestDataGenerator()
+    corpus = []
+    for documents, label in (
+        (generator.create_legitimate_documents(), 0),
+        (generator.create_fraudulent_documents(), 1),
+        (generator.create_mixed_documents(), 0.5),
+    ):
+        corpus += [(name, text, label) for name, text in documents.items()]
+    return corpus
+
+
+def labelled_corpus(folder):
+    """(name, text, label) for the .txt files under folder/fraud, folder/legitimate and folder/borderline"""
+    corpus = []
+    for subfolder, label in LABEL_FOLDERS.items():
+        for path in sorted(glob.glob(os.path.join(folder, subfolder, "*.txt"))):
+            with open(path, encoding="utf-8", errors="replace") as f:
+                corpus.append((os.path.relpath(path, folder), f.read(), label))
+    return corpus
+
+
+def fit(vectors, labels, regularisation):
+    """Fit a balanced, L2-regularised logistic regression with non-negative weights
+
+    Features are divided by their spread but not centred, and no weight may
+    be negative, so a category with no hits adds nothing to the score and
+    more hits never lower it. Labels may be fractional (borderline documents).
+    """
+    import numpy as np
+    from scipy.optimize import minimize
+
+    features = np.asarray(vectors, dtype=float)
+    targets = np.asarray(labels, dtype=float)
+    scales = features.std(axis=0)
+    # Constant features (e.g. a category no document hits) would divide by zero.
+    scales[scales == 0] = 1.0
+    scaled = features / scales
+    # Balanced: fraudulent and legitimate evidence weigh the same in total.
+    weights = targets / targets.sum() + (1 - targets) / (1 - targets).sum()
+
+    def loss(parameters):
+        coefficients, intercept = parameters[:-1], parameters[-1]
+        logits = scaled @ coefficients + intercept
+        errors = weights * (1.0 / (1.0 + np.exp(-logits)) - targets)
+        value = np.sum(weights * (np.logaddexp(0, logits) - targets * logits)) + coefficients @ coefficients / (regularisation * len(targets))
+        gradient = np.append(scaled.T @ errors + 2 * coefficients / (regularisation * len(targets)), errors.sum())
+        return value, gradient
+
+    bounds = [(0, None)] * scaled.shape[1] + [(None, None)]
+    result = minimize(loss, np.zeros(scaled.shape[1] + 1), jac=True, method="L-BFGS-B", bounds=bounds)
+    return FraudScoringModel(
+        feature_names(),
+        [0.0] * scaled.shape[1],
+        [float(s) for s in scales],
+        [float(c) for c in result.x[:-1]],
+        float(result.x[-1]),
+    )
+
+
+def leave_one_out(vectors, labels, regularisation):
+    """Each document's score from a model trained without it"""
+    scores = []
+    for i in range(len(vectors)):
+        rest = [j for j in range(len(vectors)) if j != i]
+        model = fit([vectors[j] for j in rest], [labels[j] for j in rest], regularisation)
+        scores.append(int(round(100 * model.probabilities([vectors[i]])[0])))
+    return scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--labelled", action="append", default=[], help="folder with fraud/ and legitimate/ .txt files")
+    parser.add_argument("-C", dest="regularisation", type=float, default=1.0, help="inverse L2 regularisation strength")
+    parser.add_argument("--no-default-corpus", action="store_true", help=f"leave out {LABELLED_CORPUS}")
+    parser.add_argument("--output", default=FRAUD_MODEL_PATH)
+    args = parser.parse_args()
+
+    corpus = generated_corpus()
+    for folder in ([] if args.no_default_corpus else [LABELLED_CORPUS]) + args.labelled:
+        corpus += labelled_corpus(folder)
+    if not {0, 1} <= {label for _, _, label in corpus}:
+        parser.error("the corpus needs both fraudulent and legitimate documents")
+
+    # Features come from the current lexicon; the existing model file is never read.
+    detector = FraudDetector()
+    results = [detector.analyze_text_patterns(text) for _, text, _ in corpus]
+    vectors = [feature_vector(result) for result in results]
+    labels = [label for _, _, label in corpus]
+
+    model = fit(vectors, labels, args.regularisation)
+    model.version = datetime.datetime.now().isoformat(timespec="minutes")
+    held_out = leave_one_out(vectors, labels, args.regularisation) if len(corpus) > 2 else [None] * len(corpus)
+    fitted = model.score_batch(results)
+
+    print(f"{'document':<40} {'label':>5} {'score':>5} {'held out':>8}")
+    for (name, _, label), score, held in zip(corpus, fitted, held_out):
+        print(f"{name:<40} {label:>5} {score:>5} {held if held is not None else '-':>8}")
+    for name, coefficient in zip(model.features, model.coefficients):
+        print(f"    {coefficient:+.3f}  {name}")
+
+    data = model.to_dict()
+    data["trained_on"] = {
+        "documents": len(corpus),
+        "fraudulent": labels.count(1),
+        "borderline": labels.count(0.5),
+        "regularisation": args.regularisation,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        f.write("# Written by python -m utils.train_fraud_model; retrain rather than editing by hand.\n")
+        yaml.safe_dump(data, f, sort_keys=False)
+    print(f"\nWrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()